@@ -0,0 +1,32 @@
+"""index logs token timestamp
+
+Revision ID: 9d4b7e2c1a53
+Revises: 3c9e1f4a7b20
+Create Date: 2026-10-19 15:02:17.480913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b7e2c1a53'
+down_revision: Union[str, None] = '3c9e1f4a7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently so ingest keeps writing to logs meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_logs_token_timestamp', 'logs', ['token', 'timestamp'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_logs_token_timestamp', table_name='logs', postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+import os
+from typing import FrozenSet
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.cache import membership_cache
+from app.auth.jwt import get_current_user
+from app.deps import get_db
+from app.models import Project, User, project_users
+from app.utils.purge import purge_worker
+
+load_dotenv()
+
+# comma-separated emails allowed to use the operational /dev endpoints
+ADMIN_EMAILS = frozenset(email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip())
+
+
+async def get_project_ids(db: AsyncSession, user_id: int) -> FrozenSet[str]:
+    project_ids = membership_cache.get(user_id)
+    if project_ids is None:
+        result = await db.execute(
+            select(project_users.c.project_id)
+            .join(Project, Project.id == project_users.c.project_id)
+            .where(project_users.c.user_id == user_id, Project.deleted_at.is_(None))
+        )
+        project_ids = frozenset(result.scalars().all())
+        membership_cache.set(user_id, project_ids)
+    return project_ids
+
+
+async def ensure_project_member(db: AsyncSession, user: User, project_id: str):
+    # the tombstone set is checked too, since other workers may still cache the membership
+    if purge_worker.is_tombstoned(project_id) or project_id not in await get_project_ids(db, user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+async def get_project_member(
+    project_token: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> User:
+    await ensure_project_member(db, current_user, project_token)
+    return current_user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
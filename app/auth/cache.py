@@ -0,0 +1,82 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# invalidation only reaches the worker that changed the membership, so other
+# workers may keep granting a removed member access for up to this TTL
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "10"))
+MEMBERSHIP_CACHE_SIZE = int(os.getenv("MEMBERSHIP_CACHE_SIZE", "10000"))
+
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire after their own TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, deadline = entry
+        if deadline <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserSnapshot(NamedTuple):
+    id: int
+    email: str
+
+
+# user id -> UserSnapshot
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+# bearer token -> user id, kept until the token expires
+token_cache = TTLCache(TOKEN_CACHE_SIZE, float("inf"))
+# user id -> frozenset of project ids the user belongs to
+membership_cache = TTLCache(MEMBERSHIP_CACHE_SIZE, MEMBERSHIP_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int):
+    principal_cache.pop(user_id)
+    membership_cache.pop(user_id)
+
+
+def invalidate_membership(*user_ids: int):
+    for user_id in user_ids:
+        membership_cache.pop(user_id)
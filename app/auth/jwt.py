@@ -5,8 +5,10 @@ from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 from app.models import User
 from app.deps import get_db
+from app.auth.cache import UserSnapshot, principal_cache, token_cache
 
 import os
 from dotenv import load_dotenv
@@ -39,21 +41,37 @@ async def get_current_user(
 ) -> User:
     if credentials is None:
         raise HTTPException(status_code=401, detail="Missing credentials")
-    
-    token = credentials.credentials
+    return await authenticate(db, credentials.credentials)
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+async def authenticate(db: AsyncSession, token: str) -> User:
+    """Resolves an access token to the user it was issued for."""
+    user_id = token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            sub: str = payload.get("sub")
+            if sub is None:
+                raise HTTPException(status_code=401, detail="Invalid token payload")
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
+        user_id = int(sub)
+        if "exp" in payload:
+            token_cache.set(token, user_id, ttl=payload["exp"] - datetime.now(timezone.utc).timestamp())
 
-    return user
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(select(User.id, User.email).where(User.id == user_id))
+        row = result.first()
+
+        if row is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        principal = UserSnapshot(id=row.id, email=row.email)
+        principal_cache.set(user_id, principal)
+
+    # attach the snapshot to this session without querying, so routes can still modify it
+    user = User(id=principal.id, email=principal.email)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
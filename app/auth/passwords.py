@@ -0,0 +1,76 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+load_dotenv()
+
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", "2"))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", "5"))
+
+# hashes with other rounds still verify and are flagged for re-hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_HASH_ROUNDS)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL, so threads run in parallel. At most
+    `pool_size + queue_limit` jobs are admitted; the rest are rejected with
+    503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, context: CryptContext, pool_size: int, queue_limit: int, timeout: float):
+        self.context = context
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="bcrypt")
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def _run(self, fn, *args):
+        if self.admitted >= self.pool_size + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Too many concurrent logins, try again")
+
+        loop = asyncio.get_running_loop()
+        self.admitted += 1
+        job = self.executor.submit(fn, *args)
+        # a job that timed out keeps its thread until bcrypt returns, so it stays admitted until then
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(status_code=503, detail="Password check timed out, try again")
+
+    def _release(self):
+        self.admitted -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Returns whether the password matches and, if outdated, its new hash."""
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+password_hasher = PasswordHasher(pwd_context, PASSWORD_POOL_SIZE, PASSWORD_QUEUE_LIMIT, PASSWORD_TIMEOUT_SECONDS)
@@ -1,12 +1,152 @@
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
-import os
+
+from app.utils.slow_queries import slow_query_log
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
-print("📦 DATABASE_URL:", DATABASE_URL)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+PROFILES = {
+    "development": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": True,
+        "statement_cache_size": 100,
+    },
+    "production": {
+        "echo": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 5.0,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 500,
+    },
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+
+@dataclass
+class DatabaseSettings:
+    url: str
+    profile: str
+    echo: bool
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    statement_cache_size: int
+
+    @classmethod
+    def from_env(cls, url: str = None, prefix: str = "DB_") -> "DatabaseSettings":
+        """Profile defaults (DB_PROFILE) overridden by individual DB_* variables."""
+        profile = os.getenv(f"{prefix}PROFILE", os.getenv("DB_PROFILE", "development"))
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown database profile: {profile}")
+        defaults = PROFILES[profile]
+        return cls(
+            url=url or DATABASE_URL,
+            profile=profile,
+            echo=_env_bool(f"{prefix}ECHO", defaults["echo"]),
+            pool_size=int(os.getenv(f"{prefix}POOL_SIZE", defaults["pool_size"])),
+            max_overflow=int(os.getenv(f"{prefix}MAX_OVERFLOW", defaults["max_overflow"])),
+            pool_timeout=float(os.getenv(f"{prefix}POOL_TIMEOUT", defaults["pool_timeout"])),
+            pool_recycle=int(os.getenv(f"{prefix}POOL_RECYCLE", defaults["pool_recycle"])),
+            pool_pre_ping=_env_bool(f"{prefix}POOL_PRE_PING", defaults["pool_pre_ping"]),
+            statement_cache_size=int(os.getenv(f"{prefix}STATEMENT_CACHE_SIZE", defaults["statement_cache_size"])),
+        )
+
+    def describe(self) -> dict:
+        info = asdict(self)
+        info["url"] = make_url(self.url).render_as_string(hide_password=True)
+        return info
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait and how often they time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.waits += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.waits, pool.wait_total, pool.wait_max, pool.timeouts = (
+            self.waits, self.wait_total, self.wait_max, self.timeouts
+        )
+        return pool
+
+
+def create_engine_from_settings(settings: DatabaseSettings):
+    if settings.echo:
+        # routed through logging instead of echo=True, which prints to stdout
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    return create_async_engine(
+        settings.url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        connect_args={"prepared_statement_cache_size": settings.statement_cache_size},
+    )
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "checkouts": pool.waits,
+        "wait_avg_ms": round(pool.wait_total / pool.waits * 1000, 3) if pool.waits else None,
+        "wait_max_ms": round(pool.wait_max * 1000, 3),
+        "timeouts": pool.timeouts,
+    }
+
+
+settings = DatabaseSettings.from_env()
+logger.info("Database settings: %s", settings.describe())
+
+engine = create_engine_from_settings(settings)
+slow_query_log.instrument(engine)
 SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
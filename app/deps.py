@@ -1,5 +1,16 @@
 from app.database import SessionLocal
+from app.replicas import READ_DB_MAX_STALENESS, replica_set
 
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+
+def read_db(max_staleness: float = READ_DB_MAX_STALENESS):
+    """Dependency for read-only sessions that tolerate `max_staleness` seconds of replica lag."""
+    async def get_read_db():
+        async with replica_set.session(max_staleness) as session:
+            yield session
+    return get_read_db
+
+get_read_db = read_db()
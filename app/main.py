@@ -1,26 +1,40 @@
+from app.startup import FirstRequestTimer, run_startup
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from app.routes import logs, auth, projects, analytics, seed
-from app.models import Base
+from app.routes import logs, auth, projects, analytics, seed, metrics, sampling, saved_queries
+from app.utils.sse_manager import sse_manager
+from app.replicas import replica_set
+from app.utils.purge import purge_worker
+from app.utils.rule_index import rule_index
 from app.database import engine
+from app.utils.metrics import MetricsMiddleware, instrument_engine
+from app.utils.compression import CompressionMiddleware
 import re
 
-app = FastAPI()
-
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
+    await run_startup(sse_manager, replica_set, purge_worker, rule_index)
+
     yield
 
+    await rule_index.stop()
+    await purge_worker.stop()
+    await replica_set.stop()
+    await sse_manager.stop()
+
 app = FastAPI(lifespan=lifespan)
+instrument_engine(engine)
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine)
 
 app.include_router(logs.router)
 app.include_router(auth.router)
 app.include_router(projects.router)
+app.include_router(sampling.router)
+app.include_router(saved_queries.router)
 app.include_router(analytics.router)
 app.include_router(seed.router)
+app.include_router(metrics.router)
 
 def custom_openapi():
     if app.openapi_schema:
@@ -58,3 +72,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(FirstRequestTimer)
+app.add_middleware(MetricsMiddleware)
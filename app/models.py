@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Table, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, JSON, DateTime, Float, Table, ForeignKey, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timezone
@@ -9,7 +9,7 @@ project_users = Table(
     "project_users",
     Base.metadata,
     Column("project_id", ForeignKey("projects.id"), primary_key=True),
-    Column("user_id", ForeignKey("users.id"), primary_key=True),
+    Column("user_id", ForeignKey("users.id"), primary_key=True, index=True),
 )
 
 class User(Base):
@@ -25,8 +25,21 @@ class Project(Base):
 
     id = Column(String, primary_key=True, index=True) 
     name = Column(String, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     users = relationship("User", secondary=project_users, back_populates="projects")
 
+class ProjectPurge(Base):
+    __tablename__ = "project_purges"
+
+    project_id = Column(String, ForeignKey("projects.id"), primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    total_rows = Column(Integer, nullable=True)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
 class Log(Base):
     __tablename__ = "logs"
 
@@ -40,3 +53,48 @@ class Log(Base):
     device = Column(JSON, nullable=True)
     error = Column(JSON, nullable=True)
     custom = Column(JSON, nullable=True)
+    # number of logs this row stands for when ingest sampling dropped the others
+    sample_weight = Column(Float, nullable=False, default=1.0, server_default="1")
+    # client-supplied id that makes retried sends idempotent
+    event_id = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_logs_token_timestamp", "token", "timestamp"),
+        UniqueConstraint("token", "event_id", name="uq_logs_token_event_id"),
+    )
+
+class LogBlob(Base):
+    """Compressed error/custom values too large to keep in the logs row."""
+    __tablename__ = "log_blobs"
+
+    log_id = Column(Integer, ForeignKey("logs.id", ondelete="CASCADE"), primary_key=True)
+    error = Column(LargeBinary, nullable=True)
+    custom = Column(LargeBinary, nullable=True)
+
+class SamplingRule(Base):
+    __tablename__ = "sampling_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(String, ForeignKey("projects.id"), nullable=False, index=True)
+    level = Column(String, nullable=True)
+    environment = Column(String, nullable=True)
+    message = Column(String, nullable=True)
+    rate = Column(Float, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class SavedQuery(Base):
+    __tablename__ = "saved_queries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(String, ForeignKey("projects.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    level = Column(String, nullable=True)
+    environment = Column(String, nullable=True)
+    os = Column(String, nullable=True)
+    search = Column(String, nullable=True)
+    version = Column(String, nullable=True)
+    alert = Column(Boolean, nullable=False, default=False)
+    match_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_matched_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
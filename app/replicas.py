@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from collections import Counter
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database import DatabaseSettings, SessionLocal, create_engine_from_settings, pool_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+READ_DATABASE_URLS = [url.strip() for url in os.getenv("READ_DATABASE_URLS", "").split(",") if url.strip()]
+READ_DB_MAX_STALENESS = float(os.getenv("READ_DB_MAX_STALENESS", "10"))
+READ_DB_HEALTH_INTERVAL = float(os.getenv("READ_DB_HEALTH_INTERVAL", "5"))
+READ_DB_HEALTH_TIMEOUT = float(os.getenv("READ_DB_HEALTH_TIMEOUT", "2"))
+
+# replication lag in seconds; 0 on a primary or a replica that has replayed everything it received
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, settings: DatabaseSettings):
+        self.name = name
+        self.engine = create_engine_from_settings(settings)
+        self.sessionmaker = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.failures = 0
+
+    async def check(self):
+        try:
+            async with self.engine.connect() as conn:
+                result = await asyncio.wait_for(conn.execute(LAG_QUERY), READ_DB_HEALTH_TIMEOUT)
+                lag = result.scalar()
+            self.lag = float(lag or 0)
+            self.healthy = True
+        except Exception as exc:
+            if self.healthy:
+                logger.warning("Read replica %s failed its health check: %s", self.name, exc)
+            self.healthy = False
+            self.failures += 1
+        self.checked_at = time.time()
+
+
+class ReplicaSet:
+    """
+    Routes read-only sessions to healthy replicas in round-robin order.
+
+    A replica is used only if its last health check passed and its
+    replication lag is within the staleness the endpoint tolerates;
+    otherwise the session comes from the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [
+            Replica(f"replica-{i}", DatabaseSettings.from_env(url, prefix="READ_DB_"))
+            for i, url in enumerate(urls)
+        ]
+        self._order = itertools.cycle(self.replicas) if self.replicas else None
+        self.routed: Counter = Counter()
+        self.fallbacks: Counter = Counter()
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if not self.replicas:
+            return
+        await self.check_all()
+        self.task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def check_all(self):
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(READ_DB_HEALTH_INTERVAL)
+            await self.check_all()
+
+    def choose(self, max_staleness: float) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._order)
+            if replica.healthy and replica.lag is not None and replica.lag <= max_staleness:
+                self.routed[replica.name] += 1
+                return replica
+        self.fallbacks["stale" if any(r.healthy for r in self.replicas) else "unhealthy"] += 1
+        return None
+
+    def session(self, max_staleness: float) -> AsyncSession:
+        replica = self.choose(max_staleness)
+        if replica is None:
+            self.routed["primary"] += 1
+            return SessionLocal()
+        return replica.sessionmaker()
+
+    def stats(self) -> dict:
+        return {
+            "routed": dict(self.routed),
+            "fallbacks": dict(self.fallbacks),
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "checked_at": replica.checked_at,
+                    "failures": replica.failures,
+                    "pool": pool_stats(replica.engine),
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+replica_set = ReplicaSet(READ_DATABASE_URLS)
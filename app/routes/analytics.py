@@ -3,45 +3,69 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import literal_column
 from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Query
+from types import SimpleNamespace
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from app.models import Log, User 
 from app.schemas import DashboardOut, TimePoint, FullAnalyticsOut, OSStat, DeviceStat, MessageStat, CountryStat
-from app.deps import get_db
+from app.deps import get_read_db, read_db
+from app.database import SessionLocal
 from typing import List
-from app.auth.jwt import get_current_user
+from app.auth.access import get_project_member
+from app.utils.hot_cache import hot_cache
+from app.utils.dashboard_stream import dashboard_stream
+from app.utils.etag import etag_guard, not_modified
+from app.utils.sampling import weighted_count
 
 router = APIRouter( tags=["Report"])
 
-@router.get("/projects/{project_token}/dashboard", response_model=DashboardOut)
-async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/projects/{project_token}/dashboard", response_model=DashboardOut, dependencies=[Depends(not_modified)])
+async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_project_member)):
+    return await build_dashboard(db, project_token)
+
+
+@router.get("/projects/{project_token}/dashboard/stream")
+async def stream_dashboard(project_token: str, request: Request, current_user: User = Depends(get_project_member)):
+    async def snapshot():
+        async with SessionLocal() as db:
+            dashboard = DashboardOut.model_validate(await build_dashboard(db, project_token)).model_dump()
+            # read after the counters: every log they include is committed, so its id is at most this
+            high_water = (await db.execute(select(func.max(Log.id)).where(Log.token == project_token))).scalar()
+            return dashboard, high_water or 0
+
+    event_generator = dashboard_stream.listen(project_token, request, snapshot)
+    return StreamingResponse(event_generator, media_type="text/event-stream")
+
+
+async def build_dashboard(db: AsyncSession, project_token: str) -> dict:
     now = datetime.utcnow()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     yesterday_start = today_start - timedelta(days=1)
     week_ago_start = today_start - timedelta(days=7)
 
     # Загальна кількість логів за сьогодні
-    total_today_query = select(func.count()).where(
+    total_today_query = select(weighted_count()).where(
         Log.token == project_token,
         Log.timestamp >= today_start
     )
 
     # Кількість error та critical
     error_critical_query = select(
-        func.count().filter(Log.level == 'error').label("error"),
-        func.count().filter(Log.level == 'critical').label("critical")
+        weighted_count(Log.level == 'error').label("error"),
+        weighted_count(Log.level == 'critical').label("critical")
     ).where(
         Log.token == project_token,
         Log.timestamp >= today_start
     )
 
     # Загальна кількість вчора і тиждень тому
-    total_yesterday_query = select(func.count()).where(
+    total_yesterday_query = select(weighted_count()).where(
         Log.token == project_token,
         Log.timestamp >= yesterday_start,
         Log.timestamp < today_start
     )
 
-    total_week_ago_query = select(func.count()).where(
+    total_week_ago_query = select(weighted_count()).where(
         Log.token == project_token,
         Log.timestamp >= week_ago_start,
         Log.timestamp < today_start
@@ -50,7 +74,7 @@ async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db),
     # Динаміка логів за останні 7 днів
     log_counts_query = select(
         func.date_trunc("day", Log.timestamp).label("date"),
-        func.count().label("count")
+        weighted_count().label("count")
     ).where(
         Log.token == project_token,
         Log.level.in_(["warning", "error", "critical"]),
@@ -62,7 +86,7 @@ async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db),
     # Розподіл рівнів логів за сьогодні
     level_distribution_query = select(
         Log.level,
-        func.count().label("count")
+        weighted_count().label("count")
     ).where(
         Log.token == project_token,
         Log.timestamp >= today_start
@@ -73,7 +97,7 @@ async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db),
 
     top_versions_query = select(
         app_version_expr,
-        func.count().label("errors")
+        weighted_count().label("errors")
     ).where(
         Log.token == project_token,
         Log.level.in_(["warning", "error", "critical"]),
@@ -89,14 +113,25 @@ async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db),
         Log.token == project_token
     )
 
-    total_today = (await db.execute(total_today_query)).scalar()
-    error_critical = (await db.execute(error_critical_query)).first()
+    # Сьогоднішні лічильники з кешу останніх логів, якщо він покриває весь день
+    recent = await hot_cache.view(db, project_token, since=today_start)
+    if recent:
+        levels_today = recent.level_counts(today_start)
+        total_today = sum(levels_today.values())
+        error_critical = SimpleNamespace(error=levels_today.get("error", 0), critical=levels_today.get("critical", 0))
+        level_distribution_result = [SimpleNamespace(level=k, count=v) for k, v in levels_today.items()]
+        # an empty window says nothing about older logs
+        last_log = recent.last_timestamp() or (await db.execute(last_log_query)).scalar()
+    else:
+        total_today = (await db.execute(total_today_query)).scalar()
+        error_critical = (await db.execute(error_critical_query)).first()
+        level_distribution_result = (await db.execute(level_distribution_query)).all()
+        last_log = (await db.execute(last_log_query)).scalar()
+
     total_yesterday = (await db.execute(total_yesterday_query)).scalar()
     total_week_ago = (await db.execute(total_week_ago_query)).scalar()
     log_counts_result = (await db.execute(log_counts_query)).all()
-    level_distribution_result = (await db.execute(level_distribution_query)).all()
     top_versions_result = (await db.execute(top_versions_query)).all()
-    last_log = (await db.execute(last_log_query)).scalar()
 
     def get_percentage_change(current, past):
         if past == 0:
@@ -126,12 +161,12 @@ async def get_dashboard(project_token: str, db: AsyncSession = Depends(get_db),
         "last_log_timestamp": last_log,
     }
 
-@router.get("/projects/{project_token}/analytics/logs_count", response_model=List[TimePoint])
+@router.get("/projects/{project_token}/analytics/logs_count", response_model=List[TimePoint], dependencies=[Depends(not_modified)])
 async def get_logs_count(
     project_token: str,
     interval: str = Query("day", enum=["hour", "day", "month"]),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_project_member)
 ):
     now = datetime.utcnow()
 
@@ -153,10 +188,18 @@ async def get_logs_count(
     else:
         raise ValueError("Invalid interval")
 
+    if interval == "hour":
+        recent = await hot_cache.view(db, project_token, since=start_time)
+        if recent:
+            return [
+                TimePoint(label=hour.strftime("%H:%M"), count=count, timestamp=hour)
+                for hour, count in recent.hourly_counts(start_time, levels=["warning", "error", "critical"])
+            ]
+
     query = (
         select(
             func.to_char(group_expr, label_format).label("label"),
-            func.count().label("count"),
+            weighted_count().label("count"),
             group_expr.label("timestamp")
         )
         .where(
@@ -174,12 +217,12 @@ async def get_logs_count(
     return [TimePoint(label=row.label, count=row.count, timestamp=row.timestamp) for row in rows]
 
 
-@router.get("/projects/{project_token}/analytics/summary", response_model=FullAnalyticsOut)
-async def get_full_analytics(project_token: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/projects/{project_token}/analytics/summary", response_model=FullAnalyticsOut, dependencies=[Depends(etag_guard(max_staleness=60))])
+async def get_full_analytics(project_token: str, db: AsyncSession = Depends(read_db(max_staleness=60)), current_user: User = Depends(get_project_member)):
     # ос
     os_expr = cast(Log.device["platform"], String)
     os_query = (
-        select(os_expr.label("os"), func.count().label("count"))
+        select(os_expr.label("os"), weighted_count().label("count"))
         .where(
             Log.token == project_token,
             Log.level.in_(["warning", "error", "critical"]),
@@ -192,7 +235,7 @@ async def get_full_analytics(project_token: str, db: AsyncSession = Depends(get_
     # Пристрої
     model_expr = cast(Log.device["model"], String)
     model_query = (
-        select(model_expr.label("model"), func.count().label("count"))
+        select(model_expr.label("model"), weighted_count().label("count"))
         .where(
             Log.token == project_token,
             Log.level.in_(["warning", "error", "critical"]),
@@ -200,13 +243,13 @@ async def get_full_analytics(project_token: str, db: AsyncSession = Depends(get_
             model_expr != ""
         )
         .group_by("model")
-        .order_by(func.count().desc())
+        .order_by(literal_column("count").desc())
         .limit(7)
     )
 
     # Повідомлення
     message_query = (
-        select(Log.message.label("message"), func.count().label("count"))
+        select(Log.message.label("message"), weighted_count().label("count"))
         .where(
             Log.token == project_token,
             Log.level.in_(["warning", "error", "critical"]),
@@ -214,14 +257,14 @@ async def get_full_analytics(project_token: str, db: AsyncSession = Depends(get_
             Log.message != ""
         )
         .group_by(Log.message)
-        .order_by(func.count().desc())
+        .order_by(literal_column("count").desc())
         .limit(10)
     )
 
     # Помилки по країнах
     country_expr = cast(Log.custom["country"], String)
     country_query = (
-        select(country_expr.label("country"), func.count().label("count"))
+        select(country_expr.label("country"), weighted_count().label("count"))
         .where(
             Log.token == project_token,
             Log.level.in_(["warning", "error", "critical"]),
@@ -229,7 +272,7 @@ async def get_full_analytics(project_token: str, db: AsyncSession = Depends(get_
             country_expr != ""
         )
         .group_by("country")
-        .order_by(func.count().desc())
+        .order_by(literal_column("count").desc())
         .limit(5)
     )
 
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Security
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from passlib.hash import bcrypt
 from app.deps import get_db
 from app.models import User
 from app.schemas import AuthRequest, TokenPair, UserOut, UserUpdate
 from app.auth.jwt import create_access_token, create_refresh_token, decode_token, get_current_user
+from app.auth.cache import invalidate_user
+from app.auth.passwords import password_hasher
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -15,12 +16,16 @@ async def login_or_register(auth: AuthRequest, db: AsyncSession = Depends(get_db
     user = result.scalars().first()
 
     if user:
-        if not bcrypt.verify(auth.password, user.hashed_password):
+        valid, new_hash = await password_hasher.verify(auth.password, user.hashed_password)
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid password")
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
     else:
         user = User(
             email=auth.email,
-            hashed_password=bcrypt.hash(auth.password)
+            hashed_password=await password_hasher.hash(auth.password)
         )
         db.add(user)
         await db.commit()
@@ -70,9 +75,10 @@ async def update_me(
         current_user.email = data.email
 
     if data.password:
-        current_user.hashed_password = bcrypt.hash(data.password)
+        current_user.hashed_password = await password_hasher.hash(data.password)
 
     await db.commit()
+    invalidate_user(current_user.id)
     await db.refresh(current_user)
     return current_user
 
@@ -82,6 +88,8 @@ async def delete_me(
     db: AsyncSession = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
+    user_id = current_user.id
     await db.delete(current_user)
     await db.commit()
+    invalidate_user(user_id)
     return {"detail": "User deleted"}
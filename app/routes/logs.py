@@ -1,56 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, cast, String, desc
+from sqlalchemy import and_, or_, cast, func, tuple_, String, desc
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import defer
 from datetime import datetime
 from typing import Optional, List
-from app.deps import get_db
-from app.models import Log, User
-from app.schemas import LogCreate, LogOut, LogDetail
+from app.deps import get_db, get_read_db
+from app.models import Log, LogBlob, User
+from app.schemas import FacetCount, FacetsOut, LogCreate, LogOut, LogDetail
 from sqlalchemy.future import select
 from app.utils.sse_manager import sse_manager
+from app.utils.hot_cache import hot_cache
+from app.utils.log_filter import LogFilter, normalize_environment
+from app.utils.live_tail import LiveTail
+from app.utils.metrics import DUPLICATE_EVENTS, INGESTED_EVENTS, SAMPLED_OUT_EVENTS, project_label
+from app.utils.sampling import sampler
+from app.utils.etag import not_modified
+from app.utils.purge import purge_worker
+from app.utils.rule_index import alert_channel, rule_index
+from app.utils.dedup import SAMPLED_OUT, recent_events
+from app.utils.payloads import BLOB_FIELDS, inline_custom, load_blob, split_blobs
 import json
+import os
 from fastapi.encoders import jsonable_encoder
-from app.auth.jwt import get_current_user
-
-ENVIRONMENT_MAP = {
-    "prod": "production",
-    "production": "production",
-    "stag": "staging",
-    "staging": "staging",
-    "dev": "development",
-    "development": "development",
-}
+from app.auth.jwt import authenticate, get_current_user
+from app.database import SessionLocal
+from app.auth.access import ensure_project_member, get_project_ids, get_project_member
 
 router = APIRouter(tags=["Logs"])
 
+FACET_ROW_CAP = int(os.getenv("FACET_ROW_CAP", "10000"))
+FACETS = ("level", "environment", "platform", "version", "country")
+# alert events stay well under the NOTIFY payload limit
+ALERT_MESSAGE_CHARS = 200
+# LogOut has no error/custom, so list queries leave those columns in the table
+LIST_OPTIONS = (defer(Log.error, raiseload=True), defer(Log.custom, raiseload=True))
+
 @router.post("/logs", response_model=LogOut, )
 async def create_log(log: LogCreate, db: AsyncSession = Depends(get_db)):
-    new_log = Log(**log.model_dump())
-    db.add(new_log)
+    if purge_worker.is_tombstoned(log.token):
+        raise HTTPException(status_code=410, detail="Project deleted")
+
+    seen = recent_events.get(log.token, log.event_id)
+    if seen == SAMPLED_OUT:
+        DUPLICATE_EVENTS.inc((project_label(log.token), "memory"))
+        return JSONResponse(status_code=202, content={"detail": "Sampled out"})
+    stored = await stored_log(db, seen) if seen is not None else None
+    if stored is not None:
+        DUPLICATE_EVENTS.inc((project_label(log.token), "memory"))
+        return stored
+
+    weight = await sampler.weight(db, log)
+    if weight is None:
+        SAMPLED_OUT_EVENTS.inc((project_label(log.token),))
+        # a retry of a dropped event is dropped again instead of getting another draw
+        recent_events.remember(log.token, log.event_id, SAMPLED_OUT)
+        return JSONResponse(status_code=202, content={"detail": "Sampled out"})
+
+    values, blobs = split_blobs(log.model_dump())
+    # rows without an event_id never conflict, since NULLs are distinct in the unique constraint
+    new_log = (await db.scalars(
+        insert(Log)
+        .values(**values, sample_weight=weight)
+        .on_conflict_do_nothing(index_elements=[Log.token, Log.event_id])
+        .returning(Log)
+    )).first()
+    if new_log is not None and blobs:
+        db.add(LogBlob(log_id=new_log.id, **blobs))
     await db.commit()
-    await db.refresh(new_log)
+
+    if new_log is None:
+        stored = (await db.execute(
+            select(Log).options(*LIST_OPTIONS).where(Log.token == log.token, Log.event_id == log.event_id)
+        )).scalar_one()
+        recent_events.remember(log.token, log.event_id, stored.id)
+        DUPLICATE_EVENTS.inc((project_label(log.token), "database"))
+        return stored
+
+    recent_events.remember(log.token, log.event_id, new_log.id)
+    INGESTED_EVENTS.inc((project_label(log.token),))
 
     log_out = LogOut.model_validate(new_log, from_attributes=True)
-    payload = jsonable_encoder(log_out)
-    await sse_manager.push(log.token, payload)
+    # the hot cache of every worker is fed from this event
+    payload = {**jsonable_encoder(log_out), "custom": inline_custom(log.custom)}
+    error_name = (log.error or {}).get("name")
+    await sse_manager.push(log.token, payload, error_name)
 
-    # await sse_manager.push(log.token, new_log)
+    log_data = {**log.model_dump(), "environment": normalize_environment(log.environment)}
+    for rule in rule_index.match(log.token, log_data, error_name):
+        if rule.alert:
+            await sse_manager.push(alert_channel(log.token), {
+                "id": f"{new_log.id}:{rule.id}",
+                "rule_id": rule.id,
+                "rule": rule.name,
+                "log_id": new_log.id,
+                "level": new_log.level,
+                "message": new_log.message[:ALERT_MESSAGE_CHARS],
+                "timestamp": payload["timestamp"],
+            })
 
     return new_log
 
+async def stored_log(db: AsyncSession, log_id: int) -> Optional[Log]:
+    """The log a retried event was stored as; retries get the same response as the first send."""
+    result = await db.execute(select(Log).options(*LIST_OPTIONS).where(Log.id == log_id))
+    return result.scalar_one_or_none()
+
+@router.get("/logs/stream/stats")
+async def stream_stats(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    stats = sse_manager.stats()
+    project_ids = await get_project_ids(db, current_user.id)
+    # channels are tokens, which are credentials; alert channels end in the token
+    stats["projects"] = {
+        channel: project for channel, project in stats["projects"].items()
+        if channel.rsplit(":", 1)[-1] in project_ids
+    }
+    return stats
+
 @router.get("/logs/stream/{project_token}")
-async def stream_logs(project_token: str, request: Request):
-    event_generator = sse_manager.listen(project_token, request)
+async def stream_logs(
+    project_token: str,
+    request: Request,
+    level: Optional[str] = None,
+    environment: Optional[str] = None,
+    os: Optional[str] = None,
+    search: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_project_member),
+):
+    log_filter = LogFilter.from_query(level=level, environment=environment, os=os, search=search)
+    event_generator = sse_manager.listen(project_token, request, log_filter, last_event_id)
     return StreamingResponse(event_generator, media_type="text/event-stream")
 
+@router.websocket("/logs/ws/{project_token}")
+async def tail_logs(
+    websocket: WebSocket,
+    project_token: str,
+    level: Optional[str] = None,
+    environment: Optional[str] = None,
+    os: Optional[str] = None,
+    search: Optional[str] = None,
+    access_token: Optional[str] = None,
+):
+    # browsers cannot set headers on a WebSocket, so the JWT comes as a query
+    # parameter or as the subprotocol pair "bearer", "<token>"
+    subprotocols = websocket.scope.get("subprotocols") or []
+    subprotocol = None
+    if "bearer" in subprotocols[:-1]:
+        subprotocol = "bearer"
+        access_token = subprotocols[subprotocols.index("bearer") + 1]
+    if not access_token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    # a short-lived session, so the connection is not held for the whole tail
+    async with SessionLocal() as db:
+        try:
+            user = await authenticate(db, access_token)
+            await ensure_project_member(db, user, project_token)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+    await websocket.accept(subprotocol=subprotocol)
+    log_filter = LogFilter.from_query(level=level, environment=environment, os=os, search=search)
+    await LiveTail(websocket, sse_manager, project_token, log_filter).run()
+
 @router.get("/logs", response_model=list[LogDetail])
 async def get_all_logs(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(Log))
+    project_ids = await get_project_ids(db, current_user.id)
+    result = await db.execute(select(Log).where(Log.token.in_(project_ids)))
     logs = result.scalars().all()
     return logs
 
-@router.get("/logs/{project_token}", response_model=List[LogOut])
+@router.get("/logs/{project_token}", response_model=List[LogOut], dependencies=[Depends(not_modified)])
 async def get_logs_for_project(
     project_token: str,
     level: Optional[str] = None,
@@ -59,41 +182,134 @@ async def get_logs_for_project(
     search: Optional[str] = None,
     before: Optional[datetime] = None,
     limit: int = 15,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_project_member)
 ):
-    query = select(Log).where(Log.token == project_token)
+    normalized_env = normalize_environment(environment)
+
+    if not search:
+        recent = await hot_cache.view(db, project_token)
+        ids = recent.find_ids(limit, level=level, environment=normalized_env, platform=os, before=before) if recent else None
+        if ids is not None:
+            result = await db.execute(select(Log).options(*LIST_OPTIONS).where(Log.id.in_(ids)).order_by(desc(Log.timestamp)))
+            return result.scalars().all()
+
+    query = (
+        select(Log)
+        .options(*LIST_OPTIONS)
+        .where(*filter_conditions(project_token, level, normalized_env, os, search, before))
+        .order_by(desc(Log.timestamp))
+        .limit(limit)
+    )
+
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def filter_conditions(project_token, level, normalized_env, os, search, before) -> list:
+    """WHERE clauses shared by the log list and its facets."""
+    conditions = [Log.token == project_token]
 
     if level:
-        query = query.where(Log.level == level)
+        conditions.append(Log.level == level)
 
-    if environment:
-        normalized_env = ENVIRONMENT_MAP.get(environment.lower())
-        if normalized_env:
-            query = query.where(Log.environment == normalized_env)
+    if normalized_env:
+        conditions.append(Log.environment == normalized_env)
 
     if os:
-        query = query.where(cast(Log.device["platform"], String).ilike(f"%{os}%"))
+        conditions.append(cast(Log.device["platform"], String).ilike(f"%{os}%"))
 
     if search:
-        query = query.where(or_(
+        conditions.append(or_(
             Log.message.ilike(f"%{search}%"),
             cast(Log.error["name"], String).ilike(f"%{search}%")
         ))
 
     if before:
-        query = query.where(Log.timestamp < before)
+        conditions.append(Log.timestamp < before)
 
-    query = query.order_by(desc(Log.timestamp)).limit(limit)
+    return conditions
 
-    result = await db.execute(query)
-    return result.scalars().all()
+
+@router.get("/logs/{project_token}/facets", response_model=FacetsOut, dependencies=[Depends(not_modified)])
+async def get_log_facets(
+    project_token: str,
+    level: Optional[str] = None,
+    environment: Optional[str] = None,
+    os: Optional[str] = None,
+    search: Optional[str] = None,
+    before: Optional[datetime] = None,
+    limit: int = 15,
+    top: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_project_member)
+):
+    conditions = filter_conditions(project_token, level, normalize_environment(environment), os, search, before)
+
+    page = await db.execute(
+        select(Log).options(*LIST_OPTIONS).where(*conditions).order_by(desc(Log.timestamp)).limit(limit)
+    )
+    logs = page.scalars().all()
+
+    # one grouping pass over the newest FACET_ROW_CAP matching rows; the empty set yields the totals
+    capped = (
+        select(
+            Log.level.label("level"),
+            Log.environment.label("environment"),
+            Log.device["platform"].as_string().label("platform"),
+            Log.custom["appVersion"].as_string().label("version"),
+            Log.custom["country"].as_string().label("country"),
+            Log.sample_weight,
+        )
+        .where(*conditions)
+        .order_by(desc(Log.timestamp))
+        .limit(FACET_ROW_CAP)
+        .subquery()
+    )
+    columns = [capped.c[name] for name in FACETS]
+    rows = (await db.execute(
+        select(
+            *columns,
+            func.grouping(*columns).label("grouping"),
+            func.count().label("rows"),
+            func.round(func.sum(capped.c.sample_weight)).label("count"),
+        ).group_by(func.grouping_sets(*columns, tuple_()))
+    )).all()
+
+    # GROUPING() sets a bit for every column not grouped by; the leftmost column is the highest bit
+    all_bits = (1 << len(FACETS)) - 1
+    facets = {name: [] for name in FACETS}
+    total, scanned = 0, 0
+    for row in rows:
+        if row.grouping == all_bits:
+            total, scanned = int(row.count or 0), row.rows
+            continue
+        for position, name in enumerate(FACETS):
+            if row.grouping == all_bits ^ (1 << (len(FACETS) - 1 - position)):
+                value = getattr(row, name)
+                if value not in (None, ""):
+                    facets[name].append(FacetCount(value=value, count=int(row.count)))
+                break
+
+    return FacetsOut(
+        logs=logs,
+        facets={name: sorted(counts, key=lambda c: -c.count)[:top] for name, counts in facets.items()},
+        total=total,
+        truncated=scanned >= FACET_ROW_CAP,
+    )
 
 
 @router.get("/logs/{project_token}/{log_id}", response_model=LogDetail)
-async def get_log_detail(project_token: str, log_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_log_detail(project_token: str, log_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_project_member)):
     result = await db.execute(select(Log).where(Log.id == log_id, Log.token == project_token))
     log = result.scalar_one_or_none()
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
-    return log
+
+    blob = await db.get(LogBlob, log_id)
+    if blob is None:
+        return log
+    detail = LogDetail.model_validate(log)
+    return detail.model_copy(update={
+        field: load_blob(getattr(blob, field)) for field in BLOB_FIELDS if getattr(blob, field) is not None
+    })
@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import engine, pool_stats
+from app.utils.metrics import Counter, Gauge, project_label, registry
+from app.utils.sse_manager import sse_manager
+
+router = APIRouter(tags=["Metrics"])
+
+SSE_SUBSCRIBERS = registry.register(Gauge(
+    "flutrace_sse_subscribers", "Open SSE connections per project", ("project",),
+))
+SSE_QUEUE_DEPTH = registry.register(Gauge(
+    "flutrace_sse_queue_depth", "Events waiting in SSE subscriber queues per project", ("project",),
+))
+SSE_DROPPED = registry.register(Counter(
+    "flutrace_sse_dropped_events_total", "Events dropped for slow SSE subscribers",
+))
+DB_POOL = registry.register(Gauge(
+    "flutrace_db_pool_connections", "Primary pool connections by state", ("state",),
+))
+
+
+def collect_sse():
+    stats = sse_manager.stats()
+    # projects without listeners disappear instead of lingering at zero
+    SSE_SUBSCRIBERS.series.clear()
+    SSE_QUEUE_DEPTH.series.clear()
+    for token, project in stats["projects"].items():
+        SSE_SUBSCRIBERS.set((project_label(token),), project["subscribers"])
+        SSE_QUEUE_DEPTH.set((project_label(token),), project["queue_depth"])
+    SSE_DROPPED.set_total((), stats["dropped_events"])
+
+
+def collect_pool():
+    stats = pool_stats(engine)
+    for state in ("checked_out", "checked_in", "overflow"):
+        DB_POOL.set((state,), stats[state])
+
+
+registry.add_collector(collect_sse)
+registry.add_collector(collect_pool)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
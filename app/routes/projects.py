@@ -1,15 +1,23 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
-from app.models import Project, User
-from app.schemas import ProjectCreate, ProjectOut, ProjectUpdate
-from app.deps import get_db
+from sqlalchemy import func, true
+from app.models import Log, Project, ProjectPurge, User, project_users
+from app.schemas import ProjectCreate, ProjectOut, ProjectOverview, ProjectUpdate, PurgeOut
+from app.deps import get_db, get_read_db
 from app.auth.jwt import get_current_user
+from app.auth.access import ensure_project_member, get_project_ids
+from app.auth.cache import invalidate_membership
+from app.utils.purge import purge_worker
+from app.utils.sampling import weighted_count
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+SPARKLINE_HOURS = 24
+
 @router.get("/", response_model=list[ProjectOut])
 async def get_my_projects(
     db: AsyncSession = Depends(get_db),
@@ -19,7 +27,7 @@ async def get_my_projects(
         select(Project)
         .options(selectinload(Project.users))
         .join(Project.users)
-        .where(User.id == current_user.id)
+        .where(User.id == current_user.id, Project.deleted_at.is_(None))
     )
     projects = result.scalars().all()
 
@@ -31,6 +39,82 @@ async def get_my_projects(
         ) for p in projects
     ]
 
+# declared before /{project_id} so "overview" is not taken for a project id
+@router.get("/overview", response_model=list[ProjectOverview])
+async def get_projects_overview(
+    db: AsyncSession = Depends(get_read_db),
+    primary: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # membership comes from the primary, so a lagging replica can't cache a stale set
+    project_ids = await get_project_ids(primary, current_user.id)
+    if not project_ids:
+        return []
+
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    sparkline_start = current_hour - timedelta(hours=SPARKLINE_HOURS - 1)
+
+    # one index probe per project on ix_logs_token_timestamp, instead of aggregating every log
+    latest = (
+        select(Log.timestamp)
+        .where(Log.token == Project.id)
+        .order_by(Log.timestamp.desc())
+        .limit(1)
+        .correlate(Project)
+        .lateral("latest")
+    )
+    projects = (await db.execute(
+        select(Project.id, Project.name, latest.c.timestamp)
+        .outerjoin(latest, true())
+        .where(Project.id.in_(project_ids))
+    )).all()
+    names = {row.id: row.name for row in projects}
+    last_logs = {row.id: row.timestamp for row in projects}
+
+    # hourly buckets per project cover both today's counters and the sparkline
+    hour = func.date_trunc("hour", Log.timestamp).label("hour")
+    hourly = (await db.execute(
+        select(
+            Log.token,
+            hour,
+            weighted_count().label("total"),
+            weighted_count(Log.level == "error").label("error"),
+            weighted_count(Log.level == "critical").label("critical"),
+        )
+        .where(Log.token.in_(project_ids), Log.timestamp >= min(today_start, sparkline_start))
+        .group_by(Log.token, hour)
+    )).all()
+
+    overview = {
+        project_id: {
+            "id": project_id,
+            "name": names.get(project_id, ""),
+            "total_logs_today": 0,
+            "error_logs_today": 0,
+            "critical_logs_today": 0,
+            "last_log_timestamp": last_logs.get(project_id),
+            "sparkline": [0] * SPARKLINE_HOURS,
+        }
+        for project_id in project_ids
+        if project_id in names
+    }
+    for row in hourly:
+        project = overview.get(row.token)
+        if project is None:
+            continue
+        bucket = row.hour.astimezone(timezone.utc).replace(tzinfo=None) if row.hour.tzinfo else row.hour
+        if bucket >= today_start:
+            project["total_logs_today"] += row.total
+            project["error_logs_today"] += row.error
+            project["critical_logs_today"] += row.critical
+        index = int((bucket - sparkline_start).total_seconds() // 3600)
+        if 0 <= index < SPARKLINE_HOURS:
+            project["sparkline"][index] += row.total
+
+    return sorted(overview.values(), key=lambda p: p["name"])
+
 @router.post("/", response_model=ProjectOut)
 async def create_project(
     data: ProjectCreate,
@@ -41,6 +125,7 @@ async def create_project(
     project = Project(id=project_id, name=data.name, users=[current_user])
     db.add(project)
     await db.commit()
+    invalidate_membership(current_user.id)
     await db.refresh(project, attribute_names=["users"])
     return ProjectOut(
         id=project.id,
@@ -54,6 +139,8 @@ async def get_project_by_id(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    await ensure_project_member(db, current_user, project_id)
+
     result = await db.execute(
         select(Project)
         .options(selectinload(Project.users))
@@ -61,7 +148,7 @@ async def get_project_by_id(
     )
     project = result.scalar_one_or_none()
 
-    if not project or current_user not in project.users:
+    if not project:
         raise HTTPException(status_code=403, detail="Access denied")
 
     return ProjectOut(
@@ -77,6 +164,8 @@ async def update_project_by_id(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    await ensure_project_member(db, current_user, project_id)
+
     result = await db.execute(
         select(Project)
         .options(selectinload(Project.users))
@@ -84,7 +173,7 @@ async def update_project_by_id(
     )
     project = result.scalar_one_or_none()
 
-    if not project or current_user not in project.users:
+    if not project:
         raise HTTPException(status_code=403, detail="Access denied")
 
     if data.name:
@@ -107,6 +196,8 @@ async def add_user_to_project(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    await ensure_project_member(db, current_user, project_id)
+
     result = await db.execute(
         select(Project)
         .options(selectinload(Project.users))
@@ -114,7 +205,7 @@ async def add_user_to_project(
     )
     project = result.scalars().first()
 
-    if not project or current_user not in project.users:
+    if not project:
         raise HTTPException(status_code=403, detail="Access denied")
 
     result = await db.execute(select(User).where(User.email == email))
@@ -126,6 +217,7 @@ async def add_user_to_project(
     if user_to_add not in project.users:
         project.users.append(user_to_add)
         await db.commit()
+        invalidate_membership(user_to_add.id)
         await db.refresh(project)
 
     return ProjectOut(
@@ -142,6 +234,8 @@ async def remove_user_from_project(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    await ensure_project_member(db, current_user, project_id)
+
     result = await db.execute(
         select(Project)
         .options(selectinload(Project.users))
@@ -149,7 +243,7 @@ async def remove_user_from_project(
     )
     project = result.scalars().first()
 
-    if not project or current_user not in project.users:
+    if not project:
         raise HTTPException(status_code=403, detail="Access denied")
 
     result = await db.execute(select(User).where(User.email == email))
@@ -160,6 +254,7 @@ async def remove_user_from_project(
 
     project.users.remove(user_to_remove)
     await db.commit()
+    invalidate_membership(user_to_remove.id)
     await db.refresh(project)
 
     return ProjectOut(
@@ -176,16 +271,36 @@ async def delete_project(
 ):
     project = await db.get(Project, project_id)
 
-    if not project:
+    if not project or project.deleted_at is not None:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    await ensure_project_member(db, current_user, project_id)
+
     await db.refresh(project, attribute_names=["users"])
+    member_ids = [user.id for user in project.users]
 
-    if current_user not in project.users:
-        raise HTTPException(status_code=403, detail="Access denied")
+    # logs are removed in the background; the project is rejected from here on
+    await purge_worker.enqueue(db, project)
+    invalidate_membership(*member_ids)
 
-    await db.delete(project)
-    await db.commit()
-
-    return {"detail": "Project deleted"}
+    return {"detail": "Project deleted", "purge": f"/projects/{project_id}/purge"}
 
+@router.get("/{project_id}/purge", response_model=PurgeOut)
+async def get_purge_progress(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # the project is tombstoned, so membership is checked on the link table directly
+    member = (await db.execute(
+        select(project_users.c.user_id).where(
+            project_users.c.project_id == project_id,
+            project_users.c.user_id == current_user.id,
+        )
+    )).first()
+    job = await db.get(ProjectPurge, project_id) if member else None
+
+    if not job:
+        raise HTTPException(status_code=404, detail="No purge for this project")
+
+    return job
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models import SamplingRule, User
+from app.schemas import SamplingRuleCreate, SamplingRuleOut
+from app.deps import get_db
+from app.auth.jwt import get_current_user
+from app.auth.access import ensure_project_member
+from app.utils.sampling import sampler
+
+router = APIRouter(prefix="/projects", tags=["Sampling"])
+
+@router.get("/{project_id}/sampling-rules", response_model=list[SamplingRuleOut])
+async def get_sampling_rules(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+
+    result = await db.execute(
+        select(SamplingRule)
+        .where(SamplingRule.project_id == project_id)
+        .order_by(SamplingRule.position, SamplingRule.id)
+    )
+    return result.scalars().all()
+
+@router.post("/{project_id}/sampling-rules", response_model=SamplingRuleOut, status_code=201)
+async def create_sampling_rule(
+    project_id: str,
+    data: SamplingRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+
+    rule = SamplingRule(project_id=project_id, **data.model_dump())
+    db.add(rule)
+    await db.commit()
+    await db.refresh(rule)
+    sampler.invalidate(project_id)
+    return rule
+
+@router.delete("/{project_id}/sampling-rules/{rule_id}", response_model=dict)
+async def delete_sampling_rule(
+    project_id: str,
+    rule_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+
+    rule = await db.get(SamplingRule, rule_id)
+    if not rule or rule.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Sampling rule not found")
+
+    await db.delete(rule)
+    await db.commit()
+    sampler.invalidate(project_id)
+    return {"detail": "Sampling rule deleted"}
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models import SavedQuery, User
+from app.schemas import SavedQueryCreate, SavedQueryOut
+from app.deps import get_db
+from app.auth.jwt import get_current_user
+from app.auth.access import ensure_project_member, get_project_member
+from app.utils.rule_index import alert_channel, rule_index
+from app.utils.sse_manager import sse_manager
+
+router = APIRouter(prefix="/projects", tags=["Saved queries"])
+
+async def project_queries(db: AsyncSession, project_id: str) -> list[SavedQuery]:
+    result = await db.execute(
+        select(SavedQuery).where(SavedQuery.project_id == project_id).order_by(SavedQuery.id)
+    )
+    return result.scalars().all()
+
+def with_pending(query: SavedQuery) -> SavedQueryOut:
+    # matches counted by this worker since the last flush
+    out = SavedQueryOut.model_validate(query)
+    out.match_count += rule_index.pending.get(query.id, 0)
+    return out
+
+@router.get("/{project_id}/saved-queries", response_model=list[SavedQueryOut])
+async def get_saved_queries(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+    return [with_pending(query) for query in await project_queries(db, project_id)]
+
+@router.post("/{project_id}/saved-queries", response_model=SavedQueryOut, status_code=201)
+async def create_saved_query(
+    project_id: str,
+    data: SavedQueryCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+
+    query = SavedQuery(project_id=project_id, **data.model_dump())
+    db.add(query)
+    await db.commit()
+    await db.refresh(query)
+    rule_index.load_project(project_id, await project_queries(db, project_id))
+    return query
+
+@router.delete("/{project_id}/saved-queries/{query_id}", response_model=dict)
+async def delete_saved_query(
+    project_id: str,
+    query_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    await ensure_project_member(db, current_user, project_id)
+
+    query = await db.get(SavedQuery, query_id)
+    if not query or query.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Saved query not found")
+
+    await db.delete(query)
+    await db.commit()
+    rule_index.pending.pop(query_id, None)
+    rule_index.last_matched.pop(query_id, None)
+    rule_index.load_project(project_id, await project_queries(db, project_id))
+    return {"detail": "Saved query deleted"}
+
+@router.get("/{project_token}/alerts/stream")
+async def stream_alerts(project_token: str, request: Request, current_user: User = Depends(get_project_member)):
+    event_generator = sse_manager.listen(alert_channel(project_token), request)
+    return StreamingResponse(event_generator, media_type="text/event-stream")
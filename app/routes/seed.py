@@ -1,231 +1,67 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from app.models import Log
+from app.models import Log, User
 from app.schemas import LogDetail
 from app.deps import get_db
+from app.database import SessionLocal, engine, pool_stats, settings
+from app.auth.access import get_admin_user, get_project_ids
+from app.auth.jwt import get_current_user
+from app.auth.cache import invalidate_membership
+from app.replicas import replica_set
+from app.startup import startup_report
 from sqlalchemy.future import select
+from app.utils.hot_cache import hot_cache
+from app.utils.slow_queries import slow_query_log
+from app.utils.synthetic import SyntheticConfig, generate
+from app.utils.etag import ingest_versions
 
 router = APIRouter(tags=["Dev"], prefix="/dev")
 
+# the dataset is written while the request waits, so keep it bounded
+SEED_MAX_ROWS = int(os.getenv("SEED_MAX_ROWS", "1000000"))
+SEED_MAX_PROJECTS = int(os.getenv("SEED_MAX_PROJECTS", "20"))
+
 @router.get("/logs", response_model=list[LogDetail])
 async def get_all_logs(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Log))
     logs = result.scalars().all()
     return logs
 
-@router.post("/logs/seed", status_code=201)
-async def seed_logs(db: AsyncSession = Depends(get_db)):
-    from datetime import datetime, timedelta
-    from app.schemas import LogCreate 
-    from app.models import Log
-
-    # now = datetime.utcnow()
-    # today = now.replace(hour=12, minute=0)
-    # yesterday = today - timedelta(days=1)
-
-    # base_time = datetime.utcnow().replace(hour=10, minute=0, second=0, microsecond=0)
-    # token = "15a5af3d4f274a65ba3475a518adbb76"
-    # error_info = {"name": "DatabaseTimeout", "code": "DB504"}
-    # device_info = {
-    #     "platform": "android",
-    #     "model": "Pixel 7 Pro",
-    #     "version": 34,
-    #     "manufacturer": "Google",
-    #     "systemVersion": "13",
-    #     "name": "pixel"
-    # }
-    # custom_info = {
-    #     "appVersion": "2.1.0",
-    #     "country": "Ukraine"
-    # }
-
-    # logs = []
-    # for i in range(10):
-    #     log_data = LogCreate(
-    #         message="Database timeout while fetching user profile",
-    #         level="error",
-    #         timestamp=base_time - timedelta(days=i),
-    #         token=token,
-    #         environment="production",
-    #         device=device_info,
-    #         error=error_info,
-    #         custom=custom_info,
-    #     )
-    #     logs.append(Log(**log_data.model_dump()))
-
-    # base_time = datetime.utcnow().replace(hour=14, minute=0, second=0, microsecond=0)
-    # token = "15a5af3d4f274a65ba3475a518adbb76"
-    # error_info = {"name": "AuthFailure", "code": "AUTH401"}
-    # device_info = {
-    #     "platform": "ios",
-    #     "model": "iPhone 14 Pro",
-    #     "version": 16,
-    #     "manufacturer": "Apple",
-    #     "systemVersion": "16.4",
-    #     "name": "iPhone"
-    # }
-    # custom_info = {
-    #     "appVersion": "2.2.0",
-    #     "country": "Germany"
-    # }
+@router.get("/db/pool", dependencies=[Depends(get_admin_user)])
+async def get_pool_stats():
+    return {"settings": settings.describe(), "pool": pool_stats(engine), "read_routing": replica_set.stats()}
 
-    # logs = []
-    # for i in range(7):
-    #     log_data = LogCreate(
-    #         message="Authorization failed for user session",
-    #         level="warning",
-    #         timestamp=base_time - timedelta(days=i),
-    #         token=token,
-    #         environment="staging",
-    #         device=device_info,
-    #         error=error_info,
-    #         custom=custom_info,
-    #     )
-    #     logs.append(Log(**log_data.model_dump()))
+@router.get("/db/slow-queries", dependencies=[Depends(get_admin_user)])
+async def get_slow_queries(limit: int = 20):
+    return {"settings": slow_query_log.stats(), "queries": slow_query_log.top(limit)}
 
-    base_time = datetime.utcnow().replace(hour=10, minute=0, second=0, microsecond=0)
-    token = "15a5af3d4f274a65ba3475a518adbb76"
-    error_info = {"name": "DataCorruption", "code": "DC999"}
-    device_info = {
-        "platform": "android",
-        "model": "Galaxy S23",
-        "version": 33,
-        "manufacturer": "Samsung"
-    }
-    custom_info = {
-        "appVersion": "3.0.0",
-        "country": "France"
-    }
+@router.delete("/db/slow-queries", status_code=204, dependencies=[Depends(get_admin_user)])
+async def reset_slow_queries():
+    slow_query_log.reset()
 
-    logs = []
-    for i in range(5):
-        log_data = LogCreate(
-            message="Critical: Data corruption detected during sync",
-            level="critical",
-            timestamp=base_time - timedelta(days=i),
-            token=token,
-            environment="production",
-            device=device_info,
-            error=error_info,
-            custom=custom_info,
-        )
-        logs.append(Log(**log_data.model_dump()))
+@router.get("/startup", dependencies=[Depends(get_admin_user)])
+async def get_startup_report():
+    return startup_report.as_dict()
 
-    db.add_all(logs)
-
-    # raw_logs = [
-    #     {
-    #         "message": "User signed in",
-    #         "level": "info",
-    #         "timestamp": today,
-    #         "token": "15a5af3d4f274a65ba3475a518adbb76",
-    #         "environment": "staging",
-    #         "device": {
-    #             "platform": "android",
-    #             "model": "Pixel 5",
-    #             "version": 30,
-    #             "manufacturer": "Google",
-    #             "systemVersion": "11",
-    #             "name": "Pixel"
-    #         },
-    #         "error": {"name": None, "code": None},
-    #         "custom": {
-    #             "appVersion": "1.0.0",
-    #             "userId": "xyz-123",
-    #             "country": "Ukraine"
-    #         }
-    #     },
-    #     {
-    #         "message": "Invalid login",
-    #         "level": "error",
-    #         "timestamp": yesterday.replace(hour=9),
-    #         "token": "15a5af3d4f274a65ba3475a518adbb76",
-    #         "environment": "production",
-    #         "device": {
-    #             "platform": "ios",
-    #             "model": "iPhone 14",
-    #             "version": 16,
-    #             "manufacturer": "Apple",
-    #             "systemVersion": "16.2",
-    #             "name": "iPhone"
-    #         },
-    #         "error": {"name": "LoginException", "code": "401"},
-    #         "custom": {
-    #             "appVersion": "1.0.1",
-    #             "username": "test_user",
-    #             "country": "Germany"
-    #         }
-    #     },
-    #     {
-    #         "message": "Crash on profile screen",
-    #         "level": "critical",
-    #         "timestamp": today.replace(hour=10),
-    #         "token": "15a5af3d4f274a65ba3475a518adbb76",
-    #         "environment": "staging",
-    #         "device": {
-    #             "platform": "android",
-    #             "model": "Samsung S21",
-    #             "version": 31,
-    #             "manufacturer": "Samsung",
-    #             "systemVersion": "12",
-    #             "name": "Samsung"
-    #         },
-    #         "error": {"name": "NullPointerException", "code": "E500"},
-    #         "custom": {
-    #             "appVersion": "1.0.3",
-    #             "userAction": "openProfile",
-    #             "country": "Poland"
-    #         }
-    #     },
-    #     {
-    #         "message": "Permission denied",
-    #         "level": "warning",
-    #         "timestamp": yesterday.replace(hour=14),
-    #         "token": "15a5af3d4f274a65ba3475a518adbb76",
-    #         "environment": "staging",
-    #         "device": {
-    #             "platform": "ios",
-    #             "model": "iPhone 13",
-    #             "version": 15,
-    #             "manufacturer": "Apple",
-    #             "systemVersion": "15.5",
-    #             "name": "iPhone"
-    #         },
-    #         "error": {"name": "SecurityException", "code": "E403"},
-    #         "custom": {
-    #             "appVersion": "1.0.1",
-    #             "feature": "Camera Access",
-    #             "country": "France"
-    #         }
-    #     },
-    #     {
-    #         "message": "Server timeout",
-    #         "level": "error",
-    #         "timestamp": today.replace(hour=15),
-    #         "token": "15a5af3d4f274a65ba3475a518adbb76",
-    #         "environment": "production",
-    #         "device": {
-    #             "platform": "android",
-    #             "model": "OnePlus 9",
-    #             "version": 33,
-    #             "manufacturer": "OnePlus",
-    #             "systemVersion": "13",
-    #             "name": "OnePlus"
-    #         },
-    #         "error": {"name": "TimeoutException", "code": "504"},
-    #         "custom": {
-    #             "appVersion": "1.0.4",
-    #             "request": "/api/data",
-    #             "country": "Spain"
-    #         }
-    #     }
-    # ]
-
-    # logs_to_create = [Log(**LogCreate(**log).model_dump()) for log in raw_logs]
-    # db.add_all(logs_to_create)
-
-
-    await db.commit()
-
-    return {"message": f"Seeded {len(logs)} logs successfully."}
+@router.post("/logs/seed", status_code=201)
+async def seed_logs(
+    config: SyntheticConfig = SyntheticConfig(),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not set(config.tokens) <= await get_project_ids(db, current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    if config.projects > SEED_MAX_PROJECTS:
+        raise HTTPException(status_code=422, detail=f"At most {SEED_MAX_PROJECTS} new projects per request")
+    if (config.projects + len(config.tokens)) * config.logs > SEED_MAX_ROWS:
+        raise HTTPException(status_code=422, detail=f"At most {SEED_MAX_ROWS} logs per request")
+
+    # new projects always belong to the caller
+    result = await generate(config, SessionLocal, engine, owner_id=current_user.id)
+    for token in result["tokens"]:
+        hot_cache.invalidate(token)
+        ingest_versions.bump(token)
+    invalidate_membership(current_user.id)
+    return result
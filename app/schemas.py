@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from app.utils.payloads import limit_payload
 
 class AuthRequest(BaseModel):
     email: EmailStr
@@ -33,6 +34,18 @@ class ProjectOut(BaseModel):
     class Config:
         orm_mode = True
 
+class PurgeOut(BaseModel):
+    project_id: str
+    status: str
+    total_rows: Optional[int]
+    deleted_rows: int
+    error: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
 class LogCreate(BaseModel):
     message: str
     level: str
@@ -42,6 +55,12 @@ class LogCreate(BaseModel):
     device: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
     custom: Optional[Dict[str, Any]] = None
+    event_id: Optional[str] = Field(None, min_length=1, max_length=128)
+
+    @field_validator("device", "error", "custom")
+    @classmethod
+    def limit_size(cls, value, info):
+        return limit_payload(info.field_name, value)
 
 class LogOut(BaseModel):
     id: int
@@ -51,10 +70,23 @@ class LogOut(BaseModel):
     token: str
     environment: Optional[str] = None
     device: Optional[Dict[str, Any]] = None
+    sample_weight: float = 1.0
+    event_id: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class FacetsOut(BaseModel):
+    logs: List[LogOut]
+    facets: Dict[str, List[FacetCount]]
+    total: int
+    truncated: bool
+
+
 class LogDetail(LogOut):
     device: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
@@ -91,6 +123,50 @@ class DashboardOut(BaseModel):
     last_log_timestamp: Optional[datetime]
 
 
+class SamplingRuleCreate(BaseModel):
+    level: Optional[str] = None
+    environment: Optional[str] = None
+    message: Optional[str] = None
+    rate: float = Field(..., gt=0, le=1)
+    position: int = 0
+
+class SamplingRuleOut(SamplingRuleCreate):
+    id: int
+    project_id: str
+    created_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SavedQueryCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    level: Optional[str] = None
+    environment: Optional[str] = None
+    os: Optional[str] = None
+    search: Optional[str] = None
+    version: Optional[str] = None
+    alert: bool = False
+
+class SavedQueryOut(SavedQueryCreate):
+    id: int
+    project_id: str
+    match_count: int
+    last_matched_at: Optional[datetime]
+    created_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectOverview(BaseModel):
+    id: str
+    name: str
+    total_logs_today: int
+    error_logs_today: int
+    critical_logs_today: int
+    last_log_timestamp: Optional[datetime]
+    sparkline: List[int]
+
+
 class TimePoint(BaseModel):
     label: str
     count: int
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from app.database import engine, settings
+from app.models import Base
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROCESS_STARTED = time.perf_counter()
+
+# strict: refuse to start on a schema mismatch, warn: log it, off: skip the check
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn")
+# bootstrap an empty development database without Alembic
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() in ("1", "true", "yes")
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "2"))
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+class StartupReport:
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready_ms: Optional[float] = None
+        self.first_request_ms: Optional[float] = None
+        self.schema: Dict[str, object] = {}
+
+    async def timed(self, name: str, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def as_dict(self) -> dict:
+        return {
+            "phases_ms": self.phases,
+            "ready_ms": self.ready_ms,
+            "first_request_ms": self.first_request_ms,
+            "schema": self.schema,
+        }
+
+
+startup_report = StartupReport()
+
+
+def alembic_heads() -> Set[str]:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def database_revisions() -> Set[str]:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except Exception:
+            return set()
+        return set(result.scalars().all())
+
+
+async def check_schema():
+    expected, current = await asyncio.gather(asyncio.to_thread(alembic_heads), database_revisions())
+    startup_report.schema = {"expected": sorted(expected), "current": sorted(current)}
+    if expected == current:
+        return
+    message = f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}; run `alembic upgrade head`"
+    if SCHEMA_CHECK == "strict":
+        raise RuntimeError(message)
+    logger.warning(message)
+
+
+async def warm_pool(connections: int):
+    async def open_one():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    connections = min(connections, settings.pool_size)
+    if connections > 0:
+        await asyncio.gather(*(open_one() for _ in range(connections)))
+
+
+async def create_all():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def run_startup(*services):
+    """Checks the schema, warms the pool and starts `services` concurrently."""
+    if DB_CREATE_ALL:
+        await startup_report.timed("create_all", create_all())
+
+    phases = [startup_report.timed("warm_pool", warm_pool(DB_WARM_CONNECTIONS))]
+    if SCHEMA_CHECK != "off":
+        phases.append(startup_report.timed("schema_check", check_schema()))
+    for service in services:
+        phases.append(startup_report.timed(type(service).__name__, service.start()))
+    await asyncio.gather(*phases)
+
+    startup_report.ready_ms = round((time.perf_counter() - PROCESS_STARTED) * 1000, 2)
+    logger.info("Startup finished in %sms: %s", startup_report.ready_ms, startup_report.phases)
+
+
+class FirstRequestTimer:
+    """ASGI middleware recording the time from import to the first response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or startup_report.first_request_ms is not None:
+            return await self.app(scope, receive, send)
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start" and startup_report.first_request_ms is None:
+                startup_report.first_request_ms = round((time.perf_counter() - PROCESS_STARTED) * 1000, 2)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
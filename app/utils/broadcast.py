@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SSE_BROADCAST_BACKEND = os.getenv("SSE_BROADCAST_BACKEND", "memory")
+SSE_NOTIFY_CHANNEL = os.getenv("SSE_NOTIFY_CHANNEL", "flutrace_logs")
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+SSE_NOTIFY_MAX_PAYLOAD = int(os.getenv("SSE_NOTIFY_MAX_PAYLOAD", "7900"))
+SSE_FETCH_BATCH_SIZE = int(os.getenv("SSE_FETCH_BATCH_SIZE", "200"))
+SSE_FETCH_BATCH_DELAY = float(os.getenv("SSE_FETCH_BATCH_DELAY", "0.02"))
+
+Deliver = Callable[[str, dict, Optional[str]], None]
+
+
+def clip_strings(payload: dict, excess: int) -> dict:
+    """Shortens the longest top-level strings of `payload` until it is `excess` bytes smaller."""
+    payload = dict(payload)
+    while excess > 0:
+        key = max((k for k, v in payload.items() if isinstance(v, str)), key=lambda k: len(payload[k]), default=None)
+        if key is None or not payload[key]:
+            break
+        value = payload[key]
+        # json.dumps escapes non-ASCII characters, so a character takes 1 to 6 bytes
+        before = len(json.dumps(value))
+        cut = math.ceil(excess * len(value) / (before - 2)) + 1
+        payload[key] = value[:max(len(value) - cut, 0)] + "…"
+        excess -= before - len(json.dumps(payload[key]))
+    return payload
+
+
+class LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+        }
+
+
+class MemoryBroadcast:
+    """Delivers events to subscribers of the current process only."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.deliver: Optional[Deliver] = None
+        self.latency = LatencyStats()
+
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def publish(self, project_token: str, payload: dict, error_name: Optional[str] = None):
+        started = time.perf_counter()
+        self.deliver(project_token, payload, error_name)
+        self.latency.record(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "latency": self.latency.as_dict()}
+
+
+class PostgresBroadcast:
+    """
+    Fans events out to every worker through Postgres LISTEN/NOTIFY.
+
+    All projects share one channel on a dedicated asyncpg connection per
+    worker. Events too large for a NOTIFY payload are sent as log ids and
+    loaded by the receivers in batches.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str = SSE_NOTIFY_CHANNEL,
+                 fetch_rows: Optional[Callable[[List[int]], Awaitable[List[Tuple[dict, Optional[str]]]]]] = None):
+        self.dsn = dsn
+        self.channel = channel
+        self.fetch_rows = fetch_rows or fetch_log_payloads
+        self.deliver: Optional[Deliver] = None
+        self.conn = None
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.pending_ids: Dict[int, tuple] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.flush_scheduled = False
+        self.stopping = False
+        self.latency = LatencyStats()
+        self.sent = 0
+        self.sent_by_id = 0
+        self.received = 0
+        self.reconnects = 0
+
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+        self.stopping = False
+        await self._connect()
+        self._spawn(self._publisher())
+
+    async def stop(self):
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*list(self.tasks), return_exceptions=True)
+        self.tasks.clear()
+        if self.conn is not None and not self.conn.is_closed():
+            await self.conn.close()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _connect(self):
+        import asyncpg
+
+        self.conn = await asyncpg.connect(self.dsn)
+        await self.conn.add_listener(self.channel, self._on_notify)
+        self.conn.add_termination_listener(self._on_terminated)
+
+    def _on_terminated(self, conn):
+        if not self.stopping:
+            logger.warning("Broadcast connection lost, reconnecting")
+            self._spawn(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 0.5
+        while not self.stopping:
+            try:
+                await self._connect()
+                self.reconnects += 1
+                return
+            except Exception:
+                logger.exception("Broadcast reconnect failed")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def publish(self, project_token: str, payload: dict, error_name: Optional[str] = None):
+        message = json.dumps({"t": project_token, "s": time.time(), "d": payload, "e": error_name}, default=str)
+        size = len(message.encode())
+        if size > SSE_NOTIFY_MAX_PAYLOAD:
+            if isinstance(payload.get("id"), int):
+                # a log row: receivers load it by id
+                message = json.dumps({"t": project_token, "s": time.time(), "id": payload["id"]})
+                self.sent_by_id += 1
+            else:
+                # other events (e.g. alerts) can't be reloaded, so they are shortened instead
+                payload = clip_strings(payload, size - SSE_NOTIFY_MAX_PAYLOAD)
+                message = json.dumps({"t": project_token, "s": time.time(), "d": payload, "e": error_name}, default=str)
+        self.outbox.put_nowait(message)
+
+    async def _publisher(self):
+        while True:
+            messages = [await self.outbox.get()]
+            while not self.outbox.empty():
+                messages.append(self.outbox.get_nowait())
+            try:
+                await self.conn.execute(
+                    "SELECT pg_notify($1, m) FROM unnest($2::text[]) AS m",
+                    self.channel,
+                    messages,
+                )
+                self.sent += len(messages)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to publish %d live events", len(messages))
+                await asyncio.sleep(0.5)
+
+    def _on_notify(self, conn, pid, channel, raw: str):
+        message = json.loads(raw)
+        self.received += 1
+        if "d" in message:
+            self.latency.record(time.time() - message["s"])
+            self.deliver(message["t"], message["d"], message.get("e"))
+            return
+
+        self.pending_ids[message["id"]] = (message["t"], message["s"])
+        if len(self.pending_ids) >= SSE_FETCH_BATCH_SIZE:
+            self._spawn(self._flush_ids())
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_later(SSE_FETCH_BATCH_DELAY, lambda: self._spawn(self._flush_ids()))
+
+    async def _flush_ids(self):
+        self.flush_scheduled = False
+        batch, self.pending_ids = self.pending_ids, {}
+        if not batch:
+            return
+        try:
+            rows = await self.fetch_rows(sorted(batch))
+        except Exception:
+            logger.exception("Failed to load %d live events", len(batch))
+            return
+        for payload, error_name in rows:
+            token, sent = batch[payload["id"]]
+            self.latency.record(time.time() - sent)
+            self.deliver(token, payload, error_name)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "channel": self.channel,
+            "sent": self.sent,
+            "sent_by_id": self.sent_by_id,
+            "received": self.received,
+            "reconnects": self.reconnects,
+            "latency": self.latency.as_dict(),
+        }
+
+
+async def fetch_log_payloads(ids: List[int]) -> List[Tuple[dict, Optional[str]]]:
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import select
+    from sqlalchemy.orm import defer
+    from app.database import SessionLocal
+    from app.models import Log
+    from app.schemas import LogOut
+    from app.utils.payloads import inline_custom
+
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(Log, Log.custom["appVersion"].as_string(), Log.custom["country"].as_string())
+            .options(defer(Log.custom, raiseload=True))
+            .where(Log.id.in_(ids))
+            .order_by(Log.id)
+        )
+        return [
+            (
+                {
+                    **jsonable_encoder(LogOut.model_validate(log)),
+                    "custom": inline_custom({"appVersion": version, "country": country}),
+                },
+                (log.error or {}).get("name"),
+            )
+            for log, version, country in result
+        ]
+
+
+def asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def create_backend(name: str = SSE_BROADCAST_BACKEND):
+    if name == "memory":
+        return MemoryBroadcast()
+    if name == "postgres":
+        return PostgresBroadcast(asyncpg_dsn(os.getenv("DATABASE_URL")))
+    raise ValueError(f"Unknown SSE broadcast backend: {name}")
@@ -0,0 +1,105 @@
+import gzip
+import os
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+
+load_dotenv()
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+COMPRESS_ZSTD_LEVEL = int(os.getenv("COMPRESS_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# optional codecs; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSORS = {"gzip": lambda body: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+if zstandard is not None:
+    _zstd = zstandard.ZstdCompressor(level=COMPRESS_ZSTD_LEVEL)
+    COMPRESSORS["zstd"] = _zstd.compress
+
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def negotiate(accept_encoding: str):
+    """Picks the preferred available encoding the client accepts, if any."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[name.strip()] = quality
+    for encoding in PREFERENCE:
+        if encoding in COMPRESSORS and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete responses above `minimum_size` with zstd, brotli or
+    gzip, whichever the client accepts first in that order.
+
+    Streaming responses (SSE, chunked bodies) pass through untouched, so
+    events are never held back waiting for a compressor to flush.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                return await send(message)
+
+            body = COMPRESSORS[encoding](body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.sse_manager import SSEManager, sse_manager
+
+load_dotenv()
+
+DASHBOARD_TICK_SECONDS = float(os.getenv("DASHBOARD_TICK_SECONDS", "1.0"))
+
+# returns the dashboard and the id of the newest log it may include
+Snapshot = Callable[[], Awaitable[Tuple[dict, int]]]
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class ProjectDelta:
+    def __init__(self):
+        self.levels: Counter = Counter()
+        self.last_log: Optional[datetime] = None
+
+    def add(self, level: str, timestamp: datetime, today: date, weight: float = 1.0):
+        if self.last_log is None or timestamp > self.last_log:
+            self.last_log = timestamp
+        if timestamp.astimezone(timezone.utc).date() == today:
+            self.levels[level] += weight
+
+    def message(self) -> dict:
+        return {
+            "total_logs_today": round(sum(self.levels.values())),
+            "error_logs_today": round(self.levels.get("error", 0)),
+            "critical_logs_today": round(self.levels.get("critical", 0)),
+            "level_distribution_today": {level: round(n) for level, n in self.levels.items()},
+            "last_log_timestamp": self.last_log,
+        }
+
+
+class Viewer:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.delta = ProjectDelta()
+        # id of the newest log the snapshot may include; None while a snapshot is taken
+        self.high_water: Optional[int] = None
+        self.early: List[tuple] = []
+
+    def add(self, log_id: int, level: str, timestamp: datetime, today: date, weight: float):
+        if self.high_water is None:
+            self.early.append((log_id, level, timestamp, weight))
+        elif log_id > self.high_water:
+            self.delta.add(level, timestamp, today, weight)
+
+    def settle(self, high_water: int, today: date):
+        self.high_water = high_water
+        early, self.early = self.early, []
+        for log_id, level, timestamp, weight in early:
+            self.add(log_id, level, timestamp, today, weight)
+
+
+class DashboardStream:
+    """
+    Pushes `DashboardOut` counters to dashboard viewers.
+
+    Viewers get a snapshot first and then the today-counters as deltas,
+    aggregated from live events and flushed once per tick. A viewer is
+    registered before its snapshot is taken, so no event is missed; the
+    snapshot reports the newest log id it may include and only events
+    above it are added. When the UTC day changes every viewer receives a
+    fresh snapshot.
+    """
+
+    def __init__(self, manager: SSEManager, tick: float = DASHBOARD_TICK_SECONDS):
+        self.tick = tick
+        self.viewers: Dict[str, List[Viewer]] = {}
+        self.today = utc_today()
+        self.ticker: Optional[asyncio.Task] = None
+        manager.add_observer(self.observe)
+
+    def observe(self, project_token: str, log_data: dict, error_name: Optional[str] = None):
+        viewers = self.viewers.get(project_token)
+        if not viewers:
+            return
+        timestamp = parse_timestamp(log_data.get("timestamp"))
+        if timestamp is None or not isinstance(log_data.get("id"), int):
+            return
+        for viewer in viewers:
+            viewer.add(log_data["id"], log_data.get("level"), timestamp, self.today, log_data.get("sample_weight") or 1.0)
+
+    async def _run_ticker(self):
+        while self.viewers:
+            await asyncio.sleep(self.tick)
+            today = utc_today()
+            if today != self.today:
+                self.today = today
+                for viewers in self.viewers.values():
+                    for viewer in viewers:
+                        viewer.delta = ProjectDelta()
+                        viewer.high_water = None
+                        viewer.queue.put_nowait(("rollover", None))
+                continue
+            for viewers in self.viewers.values():
+                for viewer in viewers:
+                    if viewer.delta.last_log is None:
+                        continue
+                    delta, viewer.delta = viewer.delta, ProjectDelta()
+                    viewer.queue.put_nowait(("delta", json.dumps(jsonable_encoder(delta.message()))))
+        self.ticker = None
+
+    async def listen(self, project_token: str, request: Request, snapshot: Snapshot) -> AsyncGenerator[str, None]:
+        viewer = Viewer()
+        self.viewers.setdefault(project_token, []).append(viewer)
+        if self.ticker is None:
+            self.ticker = asyncio.create_task(self._run_ticker())
+
+        try:
+            yield await self._snapshot(viewer, snapshot)
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(viewer.queue.get(), timeout=max(self.tick, 1.0))
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    continue
+                if kind == "rollover":
+                    yield await self._snapshot(viewer, snapshot)
+                else:
+                    yield f"event: {kind}\ndata: {data}\n\n"
+        finally:
+            viewers = self.viewers.get(project_token, [])
+            if viewer in viewers:
+                viewers.remove(viewer)
+            if not viewers:
+                self.viewers.pop(project_token, None)
+
+    async def _snapshot(self, viewer: Viewer, snapshot: Snapshot) -> str:
+        payload, high_water = await snapshot()
+        viewer.settle(high_water, self.today)
+        return self._frame("snapshot", payload)
+
+    @staticmethod
+    def _frame(kind: str, payload: dict) -> str:
+        return f"event: {kind}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+    def stats(self) -> dict:
+        return {
+            "projects": len(self.viewers),
+            "viewers": sum(len(viewers) for viewers in self.viewers.values()),
+        }
+
+
+dashboard_stream = DashboardStream(sse_manager)
@@ -0,0 +1,40 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.auth.cache import TTLCache
+
+load_dotenv()
+
+INGEST_DEDUP_SIZE = int(os.getenv("INGEST_DEDUP_SIZE", "100000"))
+INGEST_DEDUP_TTL_SECONDS = float(os.getenv("INGEST_DEDUP_TTL_SECONDS", "600"))
+
+# stands in for the log id of an event that sampling dropped
+SAMPLED_OUT = 0
+
+
+class RecentEvents:
+    """
+    Event ids this worker ingested lately, mapped to the id of the stored log.
+
+    SDK retries usually land within seconds, so a small LRU answers them
+    without a round trip. It is only a shortcut: the unique
+    (token, event_id) constraint is what keeps duplicates out when a retry
+    reaches another worker or outlives the TTL.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+
+    def get(self, token: str, event_id: Optional[str]) -> Optional[int]:
+        if event_id is None:
+            return None
+        return self.cache.get((token, event_id))
+
+    def remember(self, token: str, event_id: Optional[str], log_id: int):
+        if event_id is not None:
+            self.cache.set((token, event_id), log_id)
+
+
+recent_events = RecentEvents(TTLCache(INGEST_DEDUP_SIZE, INGEST_DEDUP_TTL_SECONDS))
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import time
+import uuid
+from typing import Dict
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request, Response
+
+from app.auth.access import get_project_member
+from app.replicas import READ_DB_HEALTH_INTERVAL, READ_DB_MAX_STALENESS, replica_set
+from app.utils.sse_manager import sse_manager
+
+load_dotenv()
+
+# windowed analytics ("last 24 hours", "today") shift with the clock even
+# without new logs, so tags also expire after this many seconds
+ETAG_TIME_BUCKET_SECONDS = int(os.getenv("ETAG_TIME_BUCKET_SECONDS", "60"))
+# "auto" enables tags only with the postgres broadcast backend; with the memory
+# backend a worker never hears of ingests handled by other workers and would
+# answer 304 with stale data. Set "true" only for single-worker deployments.
+ETAG_ENABLED = os.getenv("ETAG_ENABLED", "auto").lower()
+
+
+def etags_enabled() -> bool:
+    if ETAG_ENABLED == "auto":
+        return sse_manager.backend.name == "postgres"
+    return ETAG_ENABLED in ("1", "true", "yes")
+
+
+class IngestVersions:
+    """
+    Per-project counter bumped whenever a project's logs change.
+
+    Ingests arrive through the SSE fan-out, which with the Postgres
+    broadcast backend reaches every worker. The boot id keeps tags from
+    colliding after a restart resets the counters.
+    """
+
+    def __init__(self):
+        self.boot = uuid.uuid4().hex[:8]
+        self.versions: Dict[str, int] = {}
+        self.bumped_at: Dict[str, float] = {}
+
+    def bump(self, project_token: str, *_):
+        self.versions[project_token] = self.versions.get(project_token, 0) + 1
+        self.bumped_at[project_token] = time.monotonic()
+
+    def settled(self, project_token: str, max_staleness: float) -> bool:
+        """
+        Whether any read within `max_staleness` of replica lag already sees the last bump.
+
+        Until then a lagging replica may serve the previous body, which must
+        not be tagged with the new version. The lag is only measured every
+        health check, so that interval is waited out as well.
+        """
+        if not replica_set.replicas:
+            return True
+        bumped_at = self.bumped_at.get(project_token)
+        return bumped_at is None or time.monotonic() - bumped_at > max_staleness + READ_DB_HEALTH_INTERVAL
+
+    def etag(self, project_token: str, request: Request) -> str:
+        key = "|".join((
+            self.boot,
+            str(self.versions.get(project_token, 0)),
+            str(int(time.time()) // ETAG_TIME_BUCKET_SECONDS),
+            request.url.path,
+            "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items())),
+        ))
+        return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+ingest_versions = IngestVersions()
+sse_manager.add_observer(ingest_versions.bump)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def etag_guard(max_staleness: float = READ_DB_MAX_STALENESS):
+    """Dependency for endpoints whose reads tolerate `max_staleness` seconds of replica lag."""
+    async def not_modified(
+        project_token: str,
+        request: Request,
+        response: Response,
+        current_user=Depends(get_project_member),
+    ):
+        """Answers 304 before the endpoint runs any SQL when the client's tag is still current."""
+        if not etags_enabled() or not ingest_versions.settled(project_token, max_staleness):
+            return
+        etag = ingest_versions.etag(project_token, request)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return not_modified
+
+not_modified = etag_guard()
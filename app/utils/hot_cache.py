@@ -0,0 +1,384 @@
+import asyncio
+import heapq
+import os
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Log
+from app.utils.sse_manager import sse_manager
+
+load_dotenv()
+
+HOT_CACHE_ENABLED = os.getenv("HOT_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+HOT_CACHE_WINDOW_HOURS = int(os.getenv("HOT_CACHE_WINDOW_HOURS", "24"))
+HOT_CACHE_MAX_MB = float(os.getenv("HOT_CACHE_MAX_MB", "64"))
+# rows encoded between yields to the event loop while a project loads
+HOT_CACHE_LOAD_CHUNK = int(os.getenv("HOT_CACHE_LOAD_CHUNK", "5000"))
+# live events can arrive after a load already read their rows; ids loaded are
+# remembered this long so those events are not counted twice
+HOT_CACHE_LOAD_GRACE_SECONDS = float(os.getenv("HOT_CACHE_LOAD_GRACE_SECONDS", "30"))
+
+HOUR = 3600
+MISSING = 0
+
+# id, timestamp, six dictionary codes and the sample weight
+_COLUMNS = (("ids", "q"), ("ts", "d"), ("level", "I"), ("env", "I"),
+            ("platform", "I"), ("model", "I"), ("version", "I"), ("country", "I"), ("weight", "f"))
+ROW_BYTES = sum(array(code).itemsize for _, code in _COLUMNS)
+
+
+def to_epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class Dictionary:
+    """Maps strings to small integer codes; code 0 is reserved for missing values."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value) -> int:
+        if value is None or value == "":
+            return MISSING
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.codes.get(value)
+
+    def matching(self, predicate) -> Set[int]:
+        return {code for code, value in enumerate(self.values) if value is not None and predicate(value)}
+
+
+class Bucket:
+    """One hour of a project's logs stored column-wise."""
+
+    def __init__(self, hour: int):
+        self.hour = hour
+        # while every row has weight 1 counts skip the weight column
+        self.unweighted = True
+        # weighted rows per level code, so fully covered hours are counted without a scan
+        self.level_totals: Counter = Counter()
+        for name, code in _COLUMNS:
+            setattr(self, name, array(code))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, row: Tuple):
+        for (name, _), value in zip(_COLUMNS, row):
+            getattr(self, name).append(value)
+        self.level_totals[row[2]] += row[-1]
+        if row[-1] != 1:
+            self.unweighted = False
+
+    def covered_by(self, since: float, until: Optional[float]) -> bool:
+        start = self.hour * HOUR
+        return start >= since and (until is None or start + HOUR <= until)
+
+    def overlaps(self, since: float, until: Optional[float]) -> bool:
+        start = self.hour * HOUR
+        return start + HOUR > since and (until is None or start < until)
+
+    def positions(self, since: float, until: Optional[float]) -> Iterable[int]:
+        ts = self.ts
+        if until is None:
+            return (i for i in range(len(ts)) if ts[i] >= since)
+        return (i for i in range(len(ts)) if since <= ts[i] < until)
+
+
+class ProjectColumns:
+    def __init__(self, store: "HotLogCache", complete_since: float):
+        self.store = store
+        self.buckets: Dict[int, Bucket] = {}
+        self.complete_since = complete_since
+        self.max_ts: Optional[float] = None
+        self.loaded_ids: Optional[Set[int]] = None
+        self.loaded_until = 0.0
+
+    def append(self, row: Tuple):
+        ts = row[1]
+        if ts < self.complete_since:
+            return
+        hour = int(ts // HOUR)
+        bucket = self.buckets.get(hour)
+        if bucket is None:
+            bucket = self.buckets[hour] = Bucket(hour)
+        bucket.append(row)
+        self.store.rows += 1
+        if self.max_ts is None or ts > self.max_ts:
+            self.max_ts = ts
+
+    def drop_before(self, cutoff: float):
+        for hour in [h for h in self.buckets if (h + 1) * HOUR <= cutoff]:
+            self.drop_bucket(hour)
+
+    def drop_bucket(self, hour: int):
+        bucket = self.buckets.pop(hour)
+        self.store.rows -= len(bucket)
+        self.complete_since = max(self.complete_since, (hour + 1) * HOUR)
+
+    def _selected(self, since: float, until: Optional[float]):
+        for bucket in self.buckets.values():
+            if bucket.overlaps(since, until):
+                yield bucket, bucket.covered_by(since, until)
+
+    def _level_codes(self, levels: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if levels is None:
+            return None
+        return {code for code in map(self.store.levels.lookup, levels) if code is not None}
+
+    def count(self, since: datetime, until: Optional[datetime] = None, levels: Optional[Iterable[str]] = None) -> int:
+        return sum(self.level_counts(since, until, levels).values())
+
+    def level_counts(self, since: datetime, until: Optional[datetime] = None, levels: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        since_ts = to_epoch(since)
+        until_ts = to_epoch(until) if until else None
+        counts: Counter = Counter()
+        for bucket, full in self._selected(since_ts, until_ts):
+            level = bucket.level
+            if full:
+                counts.update(bucket.level_totals)
+            elif bucket.unweighted:
+                counts.update(level[i] for i in bucket.positions(since_ts, until_ts))
+            else:
+                weight = bucket.weight
+                for i in bucket.positions(since_ts, until_ts):
+                    counts[level[i]] += weight[i]
+        wanted = self._level_codes(levels)
+        values = self.store.levels.values
+        return {values[code]: round(n) for code, n in counts.items()
+                if code != MISSING and (wanted is None or code in wanted)}
+
+    def hourly_counts(self, since: datetime, levels: Optional[Iterable[str]] = None) -> List[Tuple[datetime, int]]:
+        since_ts = to_epoch(since)
+        wanted = self._level_codes(levels)
+        result = []
+        for bucket, full in self._selected(since_ts, None):
+            if full:
+                totals = bucket.level_totals
+                n = round(sum(totals.values()) if wanted is None else sum(totals[code] for code in wanted))
+                if n:
+                    result.append((from_epoch(bucket.hour * HOUR), n))
+                continue
+            level, weight = bucket.level, bucket.weight
+            rows = bucket.positions(since_ts, None)
+            if wanted is not None:
+                rows = (i for i in rows if level[i] in wanted)
+            n = sum(1 for _ in rows) if bucket.unweighted else round(sum(weight[i] for i in rows))
+            if n:
+                result.append((from_epoch(bucket.hour * HOUR), n))
+        result.sort()
+        return result
+
+    def last_timestamp(self) -> Optional[datetime]:
+        return from_epoch(self.max_ts) if self.max_ts is not None else None
+
+    def find_ids(
+        self,
+        limit: int,
+        level: Optional[str] = None,
+        environment: Optional[str] = None,
+        platform: Optional[str] = None,
+        before: Optional[datetime] = None,
+    ) -> Optional[List[int]]:
+        """Newest matching log ids, or None when older rows outside the window may be needed."""
+        store = self.store
+        filters = []
+        if level:
+            code = store.levels.lookup(level)
+            if code is None:
+                return self._enough([], limit)
+            filters.append(("level", {code}))
+        if environment:
+            code = store.environments.lookup(environment)
+            if code is None:
+                return self._enough([], limit)
+            filters.append(("env", {code}))
+        if platform:
+            needle = platform.lower()
+            codes = store.platforms.matching(lambda value: needle in value.lower())
+            if not codes:
+                return self._enough([], limit)
+            filters.append(("platform", codes))
+
+        until_ts = to_epoch(before) if before else None
+        matches: List[Tuple[float, int]] = []
+        # hours never overlap, so once `limit` matches are found older hours cannot contribute
+        for bucket, full in sorted(self._selected(self.complete_since, until_ts), key=lambda b: -b[0].hour):
+            ts, ids = bucket.ts, bucket.ids
+            rows = range(len(bucket)) if full else bucket.positions(self.complete_since, until_ts)
+            for column, codes in ((getattr(bucket, name), codes) for name, codes in filters):
+                rows = [i for i in rows if column[i] in codes]
+            matches.extend(heapq.nlargest(limit - len(matches), ((ts[i], ids[i]) for i in rows)))
+            if len(matches) >= limit:
+                break
+        return self._enough(matches, limit)
+
+    @staticmethod
+    def _enough(matches: List[Tuple[float, int]], limit: int) -> Optional[List[int]]:
+        if len(matches) < limit:
+            return None
+        return [log_id for _, log_id in matches]
+
+
+class HotLogCache:
+    """
+    Per-process column store of the most recent logs of each project.
+
+    A project is loaded from the database on first use and kept current by
+    `observe`, which sees the live event of every ingest. With the postgres
+    broadcast backend that includes ingests handled by other workers.
+    Ranges older than `complete_since` fall back to SQL.
+    """
+
+    def __init__(self, enabled: bool, window_hours: int, max_mb: float):
+        self.enabled = enabled
+        self.window = window_hours * HOUR
+        self.max_rows = int(max_mb * 1024 * 1024 // ROW_BYTES)
+        self.rows = 0
+        self.projects: Dict[str, ProjectColumns] = {}
+        self.pending: Dict[str, List[Tuple]] = {}
+        self.loading: Dict[str, asyncio.Future] = {}
+        self.levels = Dictionary()
+        self.environments = Dictionary()
+        self.platforms = Dictionary()
+        self.models = Dictionary()
+        self.versions = Dictionary()
+        self.countries = Dictionary()
+
+    def _encode(self, log_id, timestamp, level, environment, platform, model, version, country, weight) -> Tuple:
+        return (
+            log_id,
+            to_epoch(timestamp),
+            self.levels.encode(level),
+            self.environments.encode(environment),
+            self.platforms.encode(platform),
+            self.models.encode(model),
+            self.versions.encode(version),
+            self.countries.encode(country),
+            1.0 if weight is None else weight,
+        )
+
+    def observe(self, token: str, log_data: dict, error_name: Optional[str] = None):
+        if not self.enabled or (token not in self.pending and token not in self.projects):
+            return
+        timestamp = log_data.get("timestamp")
+        if timestamp is None:
+            return
+        device = log_data.get("device") or {}
+        custom = log_data.get("custom") or {}
+        row = self._encode(
+            log_data["id"], datetime.fromisoformat(timestamp), log_data.get("level"), log_data.get("environment"),
+            device.get("platform"), device.get("model"),
+            custom.get("appVersion"), custom.get("country"), log_data.get("sample_weight"),
+        )
+        if token in self.pending:
+            self.pending[token].append(row)
+            return
+        project = self.projects[token]
+        if project.loaded_ids is not None:
+            if time.time() > project.loaded_until:
+                project.loaded_ids = None
+            elif row[0] in project.loaded_ids:
+                return
+        project.append(row)
+        self._enforce_budget()
+
+    def invalidate(self, token: str):
+        project = self.projects.pop(token, None)
+        if project is not None:
+            self.rows -= sum(len(b) for b in project.buckets.values())
+
+    async def view(self, db: AsyncSession, token: str, since: Optional[datetime] = None) -> Optional[ProjectColumns]:
+        """Cached columns of a project if they cover everything from `since` on."""
+        if not self.enabled:
+            return None
+        project = self.projects.get(token)
+        if project is None:
+            project = await self._load(db, token)
+        project.drop_before(time.time() - self.window)
+        if since is not None and to_epoch(since) < project.complete_since:
+            return None
+        return project
+
+    async def _load(self, db: AsyncSession, token: str) -> ProjectColumns:
+        if token in self.loading:
+            return await asyncio.shield(self.loading[token])
+
+        future = asyncio.get_running_loop().create_future()
+        self.loading[token] = future
+        self.pending[token] = []
+        try:
+            complete_since = time.time() - self.window
+            result = await db.stream(
+                select(
+                    Log.id,
+                    Log.timestamp,
+                    Log.level,
+                    Log.environment,
+                    Log.device["platform"].as_string(),
+                    Log.device["model"].as_string(),
+                    Log.custom["appVersion"].as_string(),
+                    Log.custom["country"].as_string(),
+                    Log.sample_weight,
+                ).where(Log.token == token, Log.timestamp >= from_epoch(complete_since))
+            )
+            project = ProjectColumns(self, complete_since)
+            seen = set()
+            # a day of logs can be large; encode it in chunks so requests keep being served
+            async for chunk in result.partitions(HOT_CACHE_LOAD_CHUNK):
+                for row in chunk:
+                    seen.add(row[0])
+                    project.append(self._encode(*row))
+                await asyncio.sleep(0)
+            for row in self.pending[token]:
+                if row[0] not in seen:
+                    project.append(row)
+            project.loaded_ids = seen
+            project.loaded_until = time.time() + HOT_CACHE_LOAD_GRACE_SECONDS
+            self.projects[token] = project
+            self._enforce_budget()
+            future.set_result(project)
+            return project
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            self.pending.pop(token, None)
+            self.loading.pop(token, None)
+
+    def _enforce_budget(self):
+        while self.rows > self.max_rows:
+            oldest = min(
+                ((hour, token) for token, project in self.projects.items() for hour in project.buckets),
+                default=None,
+            )
+            if oldest is None:
+                break
+            hour, token = oldest
+            self.projects[token].drop_bucket(hour)
+
+
+hot_cache = HotLogCache(HOT_CACHE_ENABLED, HOT_CACHE_WINDOW_HOURS, HOT_CACHE_MAX_MB)
+sse_manager.add_observer(hot_cache.observe)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+from collections import Counter
+from typing import List
+
+from dotenv import load_dotenv
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.utils.log_filter import LogFilter
+from app.utils.packing import packb
+from app.utils.sse_manager import DROP_OLDEST, Event, SSEManager, Subscriber
+
+load_dotenv()
+
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "1000"))
+WS_BATCH_SECONDS = float(os.getenv("WS_BATCH_SECONDS", "0.1"))
+WS_MAX_BATCH = int(os.getenv("WS_MAX_BATCH", "500"))
+
+
+class LiveTail:
+    """
+    Binary live tail of one project over a WebSocket.
+
+    Server frames are MessagePack maps with a `type` of "logs", "summary"
+    or "ack". The client sends JSON text messages: {"type": "filter", ...}
+    with the stream filters, {"type": "pause"} and {"type": "resume"}.
+    Events the client cannot keep up with are replaced by summaries.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: SSEManager, project_token: str, log_filter: LogFilter):
+        self.websocket = websocket
+        self.manager = manager
+        self.project_token = project_token
+        self.log_filter = log_filter
+        self.subscriber = Subscriber(WS_QUEUE_SIZE, policy=DROP_OLDEST)
+        self.paused = False
+        self.skipped: Counter = Counter()
+        # control acks and event batches are sent from different tasks
+        self.send_lock = asyncio.Lock()
+
+    async def run(self):
+        self.manager.subscribe(self.project_token, self.log_filter, self.subscriber)
+        receiver = asyncio.create_task(self._receive())
+        try:
+            await self._send_loop()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+            self.manager.unsubscribe(self.project_token, self.log_filter, self.subscriber)
+
+    async def _receive(self):
+        try:
+            while True:
+                try:
+                    message = json.loads(await self.websocket.receive_text())
+                except (ValueError, KeyError):
+                    continue
+                if isinstance(message, dict):
+                    await self._control(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.subscriber.close()
+
+    async def _control(self, message: dict):
+        action = message.get("type")
+        if action == "filter":
+            new_filter = LogFilter.from_query(
+                level=message.get("level"),
+                environment=message.get("environment"),
+                os=message.get("os"),
+                search=message.get("search"),
+            )
+            # drops are still owed to the client; unsubscribing would count and reset them
+            dropped, self.subscriber.dropped = self.subscriber.dropped, 0
+            self.manager.unsubscribe(self.project_token, self.log_filter, self.subscriber)
+            self.subscriber.dropped = dropped
+            self.log_filter = new_filter
+            self.manager.subscribe(self.project_token, self.log_filter, self.subscriber)
+        elif action == "pause":
+            self.paused = True
+        elif action == "resume":
+            self.paused = False
+            if self.skipped:
+                skipped, self.skipped = self.skipped, Counter()
+                await self._summary("paused", skipped)
+        else:
+            return
+        await self._send_frame({"type": "ack", "action": action})
+
+    async def _send_loop(self):
+        queue = self.subscriber.queue
+        while True:
+            event = await queue.get()
+            if event is None:
+                return
+            await asyncio.sleep(WS_BATCH_SECONDS)
+
+            events: List[Event] = [event]
+            while not queue.empty():
+                event = queue.get_nowait()
+                if event is None:
+                    return
+                events.append(event)
+
+            if self.paused:
+                self.skipped.update(e.data.get("level") for e in events)
+                continue
+            await self._send(events)
+
+    async def _send(self, events: List[Event]):
+        if self.skipped:
+            await self._summary("paused", self.skipped)
+            self.skipped = Counter()
+
+        dropped = self.subscriber.dropped
+        if dropped:
+            self.subscriber.dropped = 0
+            self.manager.dropped_events += dropped
+            await self._send_frame({"type": "summary", "reason": "dropped", "count": dropped})
+
+        if len(events) > WS_MAX_BATCH:
+            overflow, events = events[:-WS_MAX_BATCH], events[-WS_MAX_BATCH:]
+            await self._summary("overflow", Counter(e.data.get("level") for e in overflow))
+
+        await self._send_frame({"type": "logs", "events": [e.data for e in events]})
+
+    async def _summary(self, reason: str, levels: Counter):
+        await self._send_frame({
+            "type": "summary",
+            "reason": reason,
+            "count": sum(levels.values()),
+            "levels": dict(levels),
+        })
+
+    async def _send_frame(self, message: dict):
+        async with self.send_lock:
+            await self.websocket.send_bytes(packb(message))
@@ -0,0 +1,75 @@
+from typing import Optional
+
+ENVIRONMENT_MAP = {
+    "prod": "production",
+    "production": "production",
+    "stag": "staging",
+    "staging": "staging",
+    "dev": "development",
+    "development": "development",
+}
+
+
+def normalize_environment(environment: Optional[str]) -> Optional[str]:
+    return ENVIRONMENT_MAP.get(environment.lower()) if environment else None
+
+
+class LogFilter:
+    """
+    In-memory counterpart of the `get_logs_for_project` filters.
+
+    `environment` is expected to be normalized already. Text filters are
+    case-insensitive substring matches, like the ILIKE queries they mirror.
+    `version` is an app version prefix; "3.x" and "3.*" mean "3.".
+    """
+
+    __slots__ = ("level", "environment", "os", "search", "version", "key")
+
+    def __init__(self, level: Optional[str] = None, environment: Optional[str] = None,
+                 os: Optional[str] = None, search: Optional[str] = None, version: Optional[str] = None):
+        self.level = level or None
+        self.environment = environment or None
+        self.os = os.lower() if os else None
+        self.search = search.lower() if search else None
+        self.version = version.rstrip("x*") if version else None
+        self.key = (self.level, self.environment, self.os, self.search, self.version)
+
+    @classmethod
+    def from_query(cls, level: Optional[str] = None, environment: Optional[str] = None,
+                   os: Optional[str] = None, search: Optional[str] = None) -> "LogFilter":
+        """Builds a filter from raw request parameters, normalizing the environment."""
+        return cls(level=level, environment=normalize_environment(environment), os=os, search=search)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, LogFilter) and self.key == other.key
+
+    @property
+    def is_empty(self) -> bool:
+        return self.key == (None, None, None, None, None)
+
+    def matches(self, log_data: dict, error_name: Optional[str] = None) -> bool:
+        if self.level is not None and log_data.get("level") != self.level:
+            return False
+        if self.environment is not None and log_data.get("environment") != self.environment:
+            return False
+        if self.os is not None:
+            platform = (log_data.get("device") or {}).get("platform")
+            if platform is None or self.os not in str(platform).lower():
+                return False
+        if self.search is not None:
+            message = log_data.get("message") or ""
+            if self.search not in message.lower() and (
+                error_name is None or self.search not in str(error_name).lower()
+            ):
+                return False
+        if self.version is not None:
+            app_version = (log_data.get("custom") or {}).get("appVersion")
+            if app_version is None or not str(app_version).startswith(self.version):
+                return False
+        return True
+
+
+MATCH_ALL = LogFilter()
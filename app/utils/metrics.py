@@ -0,0 +1,229 @@
+import hashlib
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_MAX_SERIES = int(os.getenv("METRICS_MAX_SERIES", "500"))
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OTHER = "other"
+
+# ASGI scope of the request being handled, so DB events can tag queries with its route
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), max_series: int = METRICS_MAX_SERIES):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self.series: Dict[Tuple, object] = {}
+
+    def _key(self, labels: Tuple) -> Tuple:
+        # once the series limit is reached new label values are folded into "other"
+        if labels in self.series or len(self.series) < self.max_series:
+            return labels
+        return (OTHER,) * len(self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        key = self._key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def set_total(self, labels: Tuple, value: float):
+        """Copies in a total kept elsewhere, from a collector; it must never decrease."""
+        self.series[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in self.series.items()
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, labels: Tuple, value: float):
+        self.series[self._key(labels)] = value
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        key = self._key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def render(self) -> List[str]:
+        return Counter.render(self)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS,
+                 max_series: int = METRICS_MAX_SERIES):
+        super().__init__(name, help, labelnames, max_series)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Tuple, value: float):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            # per-bucket counts, +Inf count, sum
+            series = self.series[key] = [[0] * len(self.buckets), 0, 0.0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, (counts, total, value_sum) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {value_sum}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Collectors refresh gauges right before each scrape."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "flutrace_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "flutrace_http_requests_in_flight", "HTTP requests currently being served",
+))
+INGESTED_EVENTS = registry.register(Counter(
+    "flutrace_ingested_events_total", "Log events ingested per project", ("project",),
+))
+SAMPLED_OUT_EVENTS = registry.register(Counter(
+    "flutrace_sampled_out_events_total", "Log events dropped by sampling rules per project", ("project",),
+))
+DUPLICATE_EVENTS = registry.register(Counter(
+    "flutrace_duplicate_events_total", "Retried log events ingested once already, by where they were caught",
+    ("project", "source"),
+))
+DB_QUERY_LATENCY = registry.register(Histogram(
+    "flutrace_db_query_duration_seconds", "Database statement latency by calling route",
+    ("route", "operation"),
+))
+
+
+def project_label(token: str) -> str:
+    """Stable alias for a project; tokens are ingest credentials and must not be scraped."""
+    return hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+def route_of(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing HTTP requests per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        token = current_scope.set(scope)
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.observe(
+                (scope["method"], route_of(scope), str(status[0])), time.perf_counter() - started
+            )
+            current_scope.reset(token)
+
+
+def instrument_engine(engine):
+    """Records statement durations on `engine`, tagged with the route that issued them."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_LATENCY.observe((route_of(current_scope.get()), operation), time.perf_counter() - started)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def on_error(context):
+        # a failed statement never reaches after_cursor_execute
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started and context.execution_context is not None:
+            started.pop()
@@ -0,0 +1,98 @@
+import struct
+from datetime import date, datetime
+
+
+def packb(obj) -> bytes:
+    """Encodes plain JSON-like data as MessagePack."""
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj, out: bytearray):
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(0xCB)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        _pack_str(obj, out)
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n < 0x100:
+            out += struct.pack(">BB", 0xC4, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xC5, n)
+        else:
+            out += struct.pack(">BI", 0xC6, n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDC, n)
+        else:
+            out += struct.pack(">BI", 0xDD, n)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDE, n)
+        else:
+            out += struct.pack(">BI", 0xDF, n)
+        for key, value in obj.items():
+            _pack(key if isinstance(key, str) else str(key), out)
+            _pack(value, out)
+    elif isinstance(obj, (datetime, date)):
+        _pack_str(obj.isoformat(), out)
+    else:
+        _pack_str(str(obj), out)
+
+
+def _pack_int(obj: int, out: bytearray):
+    if 0 <= obj < 0x80:
+        out.append(obj)
+    elif -32 <= obj < 0:
+        out.append(obj & 0xFF)
+    elif 0 <= obj < 0x100:
+        out += struct.pack(">BB", 0xCC, obj)
+    elif 0 <= obj < 0x10000:
+        out += struct.pack(">BH", 0xCD, obj)
+    elif 0 <= obj < 0x100000000:
+        out += struct.pack(">BI", 0xCE, obj)
+    elif 0 <= obj < 0x10000000000000000:
+        out += struct.pack(">BQ", 0xCF, obj)
+    elif -0x80 <= obj < 0:
+        out += struct.pack(">Bb", 0xD0, obj)
+    elif -0x8000 <= obj < 0:
+        out += struct.pack(">Bh", 0xD1, obj)
+    elif -0x80000000 <= obj < 0:
+        out += struct.pack(">Bi", 0xD2, obj)
+    elif -0x8000000000000000 <= obj < 0:
+        out += struct.pack(">Bq", 0xD3, obj)
+    else:
+        _pack_str(str(obj), out)
+
+
+def _pack_str(obj: str, out: bytearray):
+    data = obj.encode("utf-8")
+    n = len(data)
+    if n < 32:
+        out.append(0xA0 | n)
+    elif n < 0x100:
+        out += struct.pack(">BB", 0xD9, n)
+    elif n < 0x10000:
+        out += struct.pack(">BH", 0xDA, n)
+    else:
+        out += struct.pack(">BI", 0xDB, n)
+    out += data
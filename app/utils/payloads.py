@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PAYLOAD_MAX_DEPTH = int(os.getenv("PAYLOAD_MAX_DEPTH", "8"))
+PAYLOAD_MAX_STRING = int(os.getenv("PAYLOAD_MAX_STRING", "8192"))
+PAYLOAD_MAX_KEY = int(os.getenv("PAYLOAD_MAX_KEY", "128"))
+PAYLOAD_MAX_BYTES = {
+    "device": int(os.getenv("PAYLOAD_MAX_DEVICE_BYTES", "4096")),
+    "error": int(os.getenv("PAYLOAD_MAX_ERROR_BYTES", "65536")),
+    "custom": int(os.getenv("PAYLOAD_MAX_CUSTOM_BYTES", "32768")),
+}
+# error/custom values encoded larger than this go to the compressed log_blobs table
+LOG_BLOB_MIN_BYTES = int(os.getenv("LOG_BLOB_MIN_BYTES", "2048"))
+LOG_BLOB_COMPRESSION_LEVEL = int(os.getenv("LOG_BLOB_COMPRESSION_LEVEL", "6"))
+
+TRUNCATED = "_truncated"
+DEPTH_MARKER = "[truncated: nested too deep]"
+# omitted keys named in the truncation marker
+OMITTED_SAMPLE = 5
+# keys that stay in the logs row because queries filter or group on them
+INLINE_KEYS = {
+    "error": ("name",),
+    "custom": ("appVersion", "country"),
+}
+BLOB_FIELDS = tuple(INLINE_KEYS)
+
+
+def encoded_size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode())
+
+
+def _key(key: Any) -> str:
+    key = str(key)
+    if len(key) <= PAYLOAD_MAX_KEY:
+        return key
+    # the hash keeps long keys that share a prefix from collapsing into one
+    return f"{key[:PAYLOAD_MAX_KEY]}…{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+
+
+def _clip(value: Any, depth: int, max_depth: int, max_string: int) -> Any:
+    if isinstance(value, dict):
+        if depth >= max_depth:
+            return DEPTH_MARKER
+        return {_key(key): _clip(item, depth + 1, max_depth, max_string) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if depth >= max_depth:
+            return DEPTH_MARKER
+        return [_clip(item, depth + 1, max_depth, max_string) for item in value]
+    if isinstance(value, str) and len(value) > max_string:
+        return f"{value[:max_string]}…[truncated {len(value) - max_string} chars]"
+    return value
+
+
+def limit_payload(field: str, value: Optional[Dict[str, Any]], max_depth: int = PAYLOAD_MAX_DEPTH,
+                  max_string: int = PAYLOAD_MAX_STRING) -> Optional[Dict[str, Any]]:
+    """
+    Bounds a `LogCreate` JSON field in depth, string length and encoded size.
+
+    Containers nested deeper than `max_depth` and the tail of long strings
+    are replaced by markers, and long keys are shortened to a prefix plus a
+    hash of the full key. If the result is still over the field's byte
+    limit, top-level keys are kept in order while they fit; `_truncated`
+    records how many were dropped and names a few of them. The result always fits the limit, unless the limit is too
+    small even for the bare marker.
+    """
+    if value is None:
+        return None
+    max_bytes = PAYLOAD_MAX_BYTES[field]
+    size = encoded_size(value)
+    clipped = _clip(value, 1, max_depth, max_string)
+    if encoded_size(clipped) <= max_bytes:
+        return clipped
+
+    def marker(omitted: list) -> dict:
+        return {"bytes": size, "omitted": len(omitted), "sample": omitted[:OMITTED_SAMPLE]}
+
+    # reserve room for the largest marker this field can get
+    worst = marker([_key("k" * (PAYLOAD_MAX_KEY + 1))] * max(len(clipped), OMITTED_SAMPLE))
+    budget = max_bytes - encoded_size({TRUNCATED: worst})
+    kept, omitted = {}, []
+    for key, item in clipped.items():
+        item_size = encoded_size({key: item})
+        if item_size <= budget:
+            kept[key] = item
+            budget -= item_size
+        else:
+            omitted.append(key)
+    kept[TRUNCATED] = marker(omitted)
+
+    # only limits too small for the marker itself get here
+    while encoded_size(kept) > max_bytes and len(kept) > 1:
+        key = next(key for key in kept if key != TRUNCATED)
+        del kept[key]
+        omitted.append(key)
+        kept[TRUNCATED] = marker(omitted)
+    if encoded_size(kept) > max_bytes:
+        kept = {TRUNCATED: {"bytes": size, "omitted": len(omitted)}}
+    return kept
+
+
+def split_blobs(values: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """
+    Moves large error/custom values out of `values` into compressed blobs.
+
+    The logs row keeps the keys listed in INLINE_KEYS plus `"_blob": true`,
+    so filters, analytics and SSE keep working without the blob.
+    """
+    blobs = {}
+    for field in BLOB_FIELDS:
+        value = values.get(field)
+        if value is None or encoded_size(value) <= LOG_BLOB_MIN_BYTES:
+            continue
+        blobs[field] = zlib.compress(json.dumps(value, default=str).encode(), LOG_BLOB_COMPRESSION_LEVEL)
+        inline = {key: value[key] for key in INLINE_KEYS[field] if key in value}
+        inline["_blob"] = True
+        values = {**values, field: inline}
+    return values, blobs
+
+
+def inline_custom(custom: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """The inline custom keys as text, like `->>` reads them; live events carry these for filters and the hot cache."""
+    custom = custom or {}
+    return {key: str(custom[key]) for key in INLINE_KEYS["custom"] if custom.get(key) is not None}
+
+
+def load_blob(data: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    return json.loads(zlib.decompress(data)) if data is not None else None
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, select, text, update
+
+from app.database import SessionLocal, engine
+from app.models import Log, Project, ProjectPurge, SamplingRule, SavedQuery
+from app.utils.hot_cache import hot_cache
+from app.utils.rule_index import rule_index
+from app.utils.sampling import sampler
+from app.utils.sse_manager import sse_manager
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "5000"))
+PURGE_PAUSE_SECONDS = float(os.getenv("PURGE_PAUSE_SECONDS", "0.2"))
+PURGE_POLL_SECONDS = float(os.getenv("PURGE_POLL_SECONDS", "5"))
+
+# walks ix_logs_token_timestamp so each batch touches one contiguous index range
+DELETE_BATCH = text(
+    "DELETE FROM logs WHERE id IN ("
+    "SELECT id FROM logs WHERE token = :token ORDER BY timestamp LIMIT :batch_size)"
+)
+TRY_LOCK = text("SELECT pg_try_advisory_lock(hashtext('project_purge:' || :project_id))")
+UNLOCK = text("SELECT pg_advisory_unlock(hashtext('project_purge:' || :project_id))")
+
+
+class PurgeWorker:
+    """
+    Removes the logs of deleted projects in the background.
+
+    Deleting a project only tombstones it (`deleted_at`) and records a
+    `ProjectPurge` job. Every worker process polls for unfinished jobs;
+    an advisory lock makes sure one of them runs each job, in small
+    index-ordered batches with a pause in between so the table is never
+    locked for long and autovacuum keeps up. Progress is committed with
+    every batch, so a restart simply picks the job up again.
+    """
+
+    def __init__(self, batch_size: int, pause: float, poll_interval: float):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.poll_interval = poll_interval
+        self.tombstones: Set[str] = set()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.refresh()
+        self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def is_tombstoned(self, project_id: str) -> bool:
+        return project_id in self.tombstones
+
+    async def refresh(self):
+        async with SessionLocal() as db:
+            result = await db.execute(select(Project.id).where(Project.deleted_at.isnot(None)))
+            self.tombstones = set(result.scalars().all())
+
+    async def enqueue(self, db, project: Project):
+        """Tombstones `project` and records its purge job in the caller's transaction."""
+        project.deleted_at = datetime.now(timezone.utc)
+        db.add(ProjectPurge(project_id=project.id, status="pending", deleted_rows=0))
+        await db.commit()
+        self.tombstones.add(project.id)
+        hot_cache.invalidate(project.id)
+        sse_manager.replay.pop(project.id, None)
+        self.wakeup.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+                await self.run_pending()
+            except Exception:
+                logger.exception("Project purge pass failed")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    async def run_pending(self):
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(ProjectPurge.project_id).where(ProjectPurge.status.in_(["pending", "running"]))
+            )
+            project_ids = result.scalars().all()
+
+        for project_id in project_ids:
+            async with engine.connect() as lock_conn:
+                locked = (await lock_conn.execute(TRY_LOCK, {"project_id": project_id})).scalar()
+                # session-level lock outlives the transaction; don't sit idle in one
+                await lock_conn.commit()
+                if not locked:
+                    continue
+                try:
+                    await self.purge(project_id)
+                except Exception as exc:
+                    logger.exception("Purge of project %s failed, will retry", project_id)
+                    async with SessionLocal() as db:
+                        await db.execute(
+                            update(ProjectPurge).where(ProjectPurge.project_id == project_id).values(error=str(exc))
+                        )
+                        await db.commit()
+                finally:
+                    await lock_conn.execute(UNLOCK, {"project_id": project_id})
+                    await lock_conn.commit()
+
+    async def purge(self, project_id: str):
+        async with SessionLocal() as db:
+            job = await db.get(ProjectPurge, project_id)
+            if job.status == "pending":
+                job.status = "running"
+                job.total_rows = job.deleted_rows + (
+                    await db.execute(select(func.count()).select_from(Log).where(Log.token == project_id))
+                ).scalar()
+                job.updated_at = datetime.now(timezone.utc)
+                await db.commit()
+
+        while True:
+            async with SessionLocal() as db:
+                deleted = (await db.execute(
+                    DELETE_BATCH, {"token": project_id, "batch_size": self.batch_size}
+                )).rowcount
+                await db.execute(
+                    update(ProjectPurge)
+                    .where(ProjectPurge.project_id == project_id)
+                    .values(deleted_rows=ProjectPurge.deleted_rows + deleted, updated_at=datetime.now(timezone.utc))
+                )
+                await db.commit()
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        await self.finish(project_id)
+
+    async def finish(self, project_id: str):
+        """Drops derived data; the tombstone and memberships stay so ingest keeps being rejected and members can see the result."""
+        async with SessionLocal() as db:
+            await db.execute(delete(SamplingRule).where(SamplingRule.project_id == project_id))
+            await db.execute(delete(SavedQuery).where(SavedQuery.project_id == project_id))
+            await db.execute(
+                update(ProjectPurge)
+                .where(ProjectPurge.project_id == project_id)
+                .values(status="done", error=None, finished_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+        hot_cache.invalidate(project_id)
+        sampler.invalidate(project_id)
+        rule_index.load_project(project_id, ())
+        logger.info("Purged logs of project %s", project_id)
+
+
+purge_worker = PurgeWorker(PURGE_BATCH_SIZE, PURGE_PAUSE_SECONDS, PURGE_POLL_SECONDS)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, select, update
+
+from app.database import SessionLocal
+from app.models import SavedQuery
+from app.utils.log_filter import LogFilter, normalize_environment
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ALERT_RULES_REFRESH_SECONDS = float(os.getenv("ALERT_RULES_REFRESH_SECONDS", "30"))
+
+Bucket = Tuple[Optional[str], Optional[str]]
+
+saved_queries = SavedQuery.__table__
+FLUSH_MATCHES = (
+    update(saved_queries)
+    .where(saved_queries.c.id == bindparam("rule_id"))
+    .values(
+        match_count=saved_queries.c.match_count + bindparam("matches"),
+        last_matched_at=bindparam("matched_at"),
+    )
+)
+
+
+def alert_channel(project_id: str) -> str:
+    """SSE channel carrying the alert events of a project."""
+    return f"alerts:{project_id}"
+
+
+class CompiledRule:
+    __slots__ = ("id", "project_id", "name", "alert", "filter")
+
+    def __init__(self, rule: SavedQuery):
+        self.id = rule.id
+        self.project_id = rule.project_id
+        self.name = rule.name
+        self.alert = rule.alert
+        self.filter = LogFilter(
+            level=rule.level,
+            environment=normalize_environment(rule.environment),
+            os=rule.os,
+            search=rule.search,
+            version=rule.version,
+        )
+
+    @property
+    def bucket(self) -> Bucket:
+        return self.filter.level, self.filter.environment
+
+
+class RuleIndex:
+    """
+    Saved queries of every project, matched against logs as they are ingested.
+
+    Rules are grouped by project and then by (level, environment), with
+    None standing for "any", so an event only evaluates the rules of at
+    most four buckets instead of every rule of the project. Matches are
+    counted in memory and added to `saved_queries.match_count` on each
+    refresh, which also reloads the rules changed by other workers.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.projects: Dict[str, Dict[Bucket, List[CompiledRule]]] = {}
+        self.pending: Counter = Counter()
+        self.last_matched: Dict[int, datetime] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.reload()
+        self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        await self.flush()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.flush()
+                await self.reload()
+            except Exception:
+                logger.exception("Saved query refresh failed")
+
+    async def reload(self):
+        async with SessionLocal() as db:
+            result = await db.execute(select(SavedQuery))
+            rules = result.scalars().all()
+        projects: Dict[str, Dict[Bucket, List[CompiledRule]]] = {}
+        for rule in map(CompiledRule, rules):
+            projects.setdefault(rule.project_id, {}).setdefault(rule.bucket, []).append(rule)
+        self.projects = projects
+
+    def load_project(self, project_id: str, rules: Iterable[SavedQuery]):
+        """Replaces the rules of one project, right after they changed in this worker."""
+        buckets: Dict[Bucket, List[CompiledRule]] = {}
+        for rule in map(CompiledRule, rules):
+            buckets.setdefault(rule.bucket, []).append(rule)
+        if buckets:
+            self.projects[project_id] = buckets
+        else:
+            self.projects.pop(project_id, None)
+
+    def match(self, project_id: str, log_data: dict, error_name: Optional[str] = None) -> List[CompiledRule]:
+        """Rules of `project_id` matching `log_data`; its environment must be normalized already."""
+        buckets = self.projects.get(project_id)
+        if not buckets:
+            return []
+        level, environment = log_data.get("level"), log_data.get("environment")
+        matched = []
+        for bucket in dict.fromkeys(((level, environment), (level, None), (None, environment), (None, None))):
+            for rule in buckets.get(bucket, ()):
+                if rule.filter.matches(log_data, error_name):
+                    matched.append(rule)
+        if matched:
+            now = datetime.now(timezone.utc)
+            for rule in matched:
+                self.pending[rule.id] += 1
+                self.last_matched[rule.id] = now
+        return matched
+
+    async def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, Counter()
+        last_matched, self.last_matched = self.last_matched, {}
+        params = [
+            {"rule_id": rule_id, "matches": matches, "matched_at": last_matched[rule_id]}
+            for rule_id, matches in pending.items()
+        ]
+        try:
+            async with SessionLocal() as db:
+                await db.execute(FLUSH_MATCHES, params)
+                await db.commit()
+        except Exception:
+            # keep the counts for the next attempt
+            self.pending.update(pending)
+            for rule_id, matched_at in last_matched.items():
+                self.last_matched.setdefault(rule_id, matched_at)
+            raise
+
+
+rule_index = RuleIndex(ALERT_RULES_REFRESH_SECONDS)
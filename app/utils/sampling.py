@@ -0,0 +1,82 @@
+import os
+import random
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.cache import TTLCache
+from app.models import Log, SamplingRule
+from app.utils.log_filter import LogFilter, normalize_environment
+
+load_dotenv()
+
+SAMPLING_RULES_TTL_SECONDS = float(os.getenv("SAMPLING_RULES_TTL_SECONDS", "30"))
+SAMPLING_RULES_CACHE_SIZE = int(os.getenv("SAMPLING_RULES_CACHE_SIZE", "10000"))
+
+
+def weighted_count(condition=None):
+    """Number of logs the matching rows stand for, counting each kept row by its sample weight."""
+    total = func.sum(Log.sample_weight)
+    if condition is not None:
+        total = total.filter(condition)
+    return cast(func.round(func.coalesce(total, 0)), Integer)
+
+
+class Sampler:
+    """
+    Decides at ingest which logs are stored, by per-project rules.
+
+    Rules are tried in `position` order and the first match applies: the
+    log is kept with probability `rate` and, if kept, stores `1 / rate` as
+    its weight so weighted counts stay unbiased. Unmatched logs are kept
+    with weight 1. Rules are cached per project for a short TTL.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+        self.kept = 0
+        self.dropped = 0
+
+    async def rules(self, db: AsyncSession, project_id: str) -> Tuple[Tuple[LogFilter, float], ...]:
+        rules = self.cache.get(project_id)
+        if rules is None:
+            result = await db.execute(
+                select(SamplingRule)
+                .where(SamplingRule.project_id == project_id)
+                .order_by(SamplingRule.position, SamplingRule.id)
+            )
+            rules = tuple(
+                (LogFilter(level=rule.level, environment=normalize_environment(rule.environment), search=rule.message), rule.rate)
+                for rule in result.scalars().all()
+            )
+            self.cache.set(project_id, rules)
+        return rules
+
+    async def weight(self, db: AsyncSession, log) -> Optional[float]:
+        """Sample weight for `log`, or None when it is dropped."""
+        rules = await self.rules(db, log.token)
+        if not rules:
+            return 1.0
+        log_data = {
+            "level": log.level,
+            "environment": normalize_environment(log.environment),
+            "message": log.message,
+            "device": log.device,
+        }
+        error_name = (log.error or {}).get("name")
+        for log_filter, rate in rules:
+            if log_filter.matches(log_data, error_name):
+                if random.random() < rate:
+                    self.kept += 1
+                    return 1.0 / rate
+                self.dropped += 1
+                return None
+        return 1.0
+
+    def invalidate(self, project_id: str):
+        self.cache.pop(project_id)
+
+
+sampler = Sampler(TTLCache(SAMPLING_RULES_CACHE_SIZE, SAMPLING_RULES_TTL_SECONDS))
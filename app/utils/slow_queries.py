@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.utils.metrics import current_scope, route_of
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "200"))
+SLOW_QUERY_EXPLAIN_TIMEOUT = float(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT", "10"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_CALL = re.compile(r"\b([a-z_][a-z0-9_.]*)\s*\(", re.IGNORECASE)
+
+# words followed by "(" that are syntax, not function calls
+SQL_KEYWORDS = {
+    "select", "from", "where", "in", "values", "exists", "any", "all", "over", "filter", "as", "on",
+    "using", "and", "or", "not", "join", "lateral", "sets", "by", "cast", "then", "else", "when", "limit",
+}
+# built-ins without side effects that are safe to execute again under ANALYZE
+SAFE_FUNCTIONS = {
+    "count", "sum", "min", "max", "avg", "coalesce", "round", "date_trunc", "to_char", "lower", "upper",
+    "grouping", "json_extract_path_text", "json_extract_path", "nullif", "greatest", "least", "now",
+}
+
+
+def fingerprint(statement: str) -> str:
+    """Normalized SQL with literals and placeholders replaced by `?`."""
+    sql = _STRING.sub("?", statement)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def calls_unsafe_functions(statement: str) -> bool:
+    """True if `statement` calls a function ANALYZE must not run, such as pg_try_advisory_lock."""
+    return any(
+        name.lower() not in SQL_KEYWORDS and name.lower() not in SAFE_FUNCTIONS
+        for name in _CALL.findall(_STRING.sub("?", statement))
+    )
+
+
+def parameter_shape(parameters) -> List[str]:
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+    shape = []
+    for value in parameters or ():
+        if isinstance(value, (list, tuple)):
+            shape.append(f"{type(value).__name__}[{len(value)}]")
+        else:
+            shape.append(type(value).__name__)
+    return shape
+
+
+class QueryStats:
+    def __init__(self, key: str, sql: str, shape: List[str]):
+        self.key = key
+        self.sql = sql
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.routes: Dict[str, int] = {}
+        self.last_seen: Optional[float] = None
+        self.plan = None
+        self.plan_at: Optional[float] = None
+        self.plan_analyzed = False
+
+    def as_dict(self) -> dict:
+        return {
+            "fingerprint": self.key,
+            "sql": self.sql,
+            "parameters": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2),
+            "max_ms": round(self.max_ms, 2),
+            "routes": self.routes,
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+            "plan_at": self.plan_at,
+            "plan_analyzed": self.plan_analyzed,
+        }
+
+
+class SlowQueryLog:
+    """
+    Aggregates statements slower than `threshold_ms` by SQL fingerprint.
+
+    A sampled fraction of slow SELECTs is re-run under
+    EXPLAIN (ANALYZE, BUFFERS) in the background, one at a time and inside
+    a rolled-back transaction, so the plan is stored next to the timings.
+    Statements calling functions outside SAFE_FUNCTIONS only get a plain
+    EXPLAIN, since a rollback cannot undo effects like session-level
+    advisory locks.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample: float, max_fingerprints: int):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self.max_fingerprints = max_fingerprints
+        self.queries: Dict[str, QueryStats] = {}
+        self.explaining = False
+        self.explained = 0
+        self.explain_failures = 0
+
+    def instrument(self, engine):
+        from sqlalchemy import event
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.record(engine, statement, parameters, elapsed_ms, executemany)
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def on_error(context):
+            started = context.connection.info.get("slow_query_started") if context.connection is not None else None
+            if started and context.execution_context is not None:
+                started.pop()
+
+    def record(self, engine, statement: str, parameters, elapsed_ms: float, executemany: bool = False):
+        sql = fingerprint(statement)
+        key = hashlib.md5(sql.encode()).hexdigest()[:16]
+        stats = self.queries.get(key)
+        if stats is None:
+            if len(self.queries) >= self.max_fingerprints:
+                cheapest = min(self.queries.values(), key=lambda q: q.total_ms)
+                del self.queries[cheapest.key]
+            shape = ["executemany"] if executemany else parameter_shape(parameters)
+            stats = self.queries[key] = QueryStats(key, sql, shape)
+
+        route = route_of(current_scope.get())
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.routes[route] = stats.routes.get(route, 0) + 1
+        stats.last_seen = time.time()
+
+        if (
+            not executemany
+            and not self.explaining
+            and sql[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample
+        ):
+            self.explaining = True
+            asyncio.get_running_loop().create_task(self._explain(engine, stats, statement, parameters))
+
+    async def _explain(self, engine, stats: QueryStats, statement: str, parameters):
+        try:
+            async with engine.connect() as conn:
+                driver = (await conn.get_raw_connection()).driver_connection
+                transaction = driver.transaction()
+                await transaction.start()
+                analyze = not calls_unsafe_functions(statement)
+                options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+                try:
+                    plan = await asyncio.wait_for(
+                        driver.fetchval(f"EXPLAIN ({options}) {statement}", *(parameters or ())),
+                        SLOW_QUERY_EXPLAIN_TIMEOUT,
+                    )
+                finally:
+                    # ANALYZE executes the statement; nothing it did may survive
+                    await transaction.rollback()
+            stats.plan = json.loads(plan) if isinstance(plan, str) else plan
+            stats.plan_at = time.time()
+            stats.plan_analyzed = analyze
+            self.explained += 1
+        except Exception as exc:
+            self.explain_failures += 1
+            logger.warning("EXPLAIN of slow query %s failed: %s", stats.key, exc)
+        finally:
+            self.explaining = False
+
+    def top(self, limit: int = 20) -> List[dict]:
+        ranked = sorted(self.queries.values(), key=lambda q: q.total_ms, reverse=True)
+        return [q.as_dict() for q in ranked[:limit]]
+
+    def reset(self):
+        self.queries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_sample": self.explain_sample,
+            "fingerprints": len(self.queries),
+            "explained": self.explained,
+            "explain_failures": self.explain_failures,
+        }
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_SAMPLE, SLOW_QUERY_MAX_FINGERPRINTS)
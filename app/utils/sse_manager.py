@@ -1,35 +1,281 @@
 import asyncio
 import json
-from typing import Dict, List, AsyncGenerator
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, AsyncGenerator, Optional
 from fastapi import Request
+from dotenv import load_dotenv
+from app.utils.broadcast import create_backend
+from app.utils.log_filter import LogFilter, MATCH_ALL
+
+load_dotenv()
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_OVERFLOW_POLICY = os.getenv("SSE_OVERFLOW_POLICY", "drop_oldest")
+SSE_DISCONNECT_POLL_SECONDS = float(os.getenv("SSE_DISCONNECT_POLL_SECONDS", "1.0"))
+SSE_REPLAY_SIZE = int(os.getenv("SSE_REPLAY_SIZE", "500"))
+# any token can be posted to, so buffers are bounded in number and dropped when idle
+SSE_REPLAY_MAX_PROJECTS = int(os.getenv("SSE_REPLAY_MAX_PROJECTS", "1000"))
+SSE_REPLAY_IDLE_SECONDS = float(os.getenv("SSE_REPLAY_IDLE_SECONDS", "600"))
+SSE_COALESCE_SECONDS = float(os.getenv("SSE_COALESCE_SECONDS", "0.05"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+HEARTBEAT = ": keep-alive\n\n"
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+class Event:
+    __slots__ = ("id", "data", "_json")
+
+    def __init__(self, event_id, data: dict):
+        self.id = event_id
+        self.data = data
+        self._json = None
+
+    @property
+    def json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.data, default=str)
+        return self._json
+
+
+class ReplayBuffer(deque):
+    """Recent events of one project, with the time of the last one."""
+
+    def __init__(self, maxlen: int):
+        super().__init__(maxlen=maxlen)
+        self.touched = time.monotonic()
+
+
+class Subscriber:
+    def __init__(self, maxsize: int, policy: Optional[str] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.closed = False
+        self.dropped = 0
+
+    def offer(self, data: Event, policy: str) -> bool:
+        """Queues `data`; returns True only if this offer disconnected a slow subscriber."""
+        policy = self.policy or policy
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(data)
+            return False
+        except asyncio.QueueFull:
+            pass
+
+        if policy == DISCONNECT:
+            self.close()
+            return True
+
+        self.queue.get_nowait()
+        self.dropped += 1
+        self.queue.put_nowait(data)
+        return False
+
+    def close(self):
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # wake up the listener so it notices the close
+        self.queue.put_nowait(None)
+
+
+def format_event(event: Event) -> str:
+    if event.id is None:
+        return f"data: {event.json}\n\n"
+    return f"id: {event.id}\ndata: {event.json}\n\n"
+
 
 class SSEManager:
-    def __init__(self):
-        self.connections: Dict[str, List[asyncio.Queue]] = {}
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE, overflow_policy: str = SSE_OVERFLOW_POLICY,
+                 poll_interval: float = SSE_DISCONNECT_POLL_SECONDS, replay_size: int = SSE_REPLAY_SIZE,
+                 coalesce_interval: float = SSE_COALESCE_SECONDS, heartbeat_interval: float = SSE_HEARTBEAT_SECONDS,
+                 replay_max_projects: int = SSE_REPLAY_MAX_PROJECTS, replay_idle: float = SSE_REPLAY_IDLE_SECONDS,
+                 backend=None):
+        if overflow_policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown SSE overflow policy: {overflow_policy}")
+        # project token -> filter -> subscribers sharing that filter
+        self.connections: Dict[str, Dict[LogFilter, List[Subscriber]]] = {}
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.poll_interval = poll_interval
+        self.replay_size = replay_size
+        self.coalesce_interval = coalesce_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.replay_max_projects = replay_max_projects
+        self.replay_idle = replay_idle
+        # project token -> recent (event id, log data, error name), kept even without subscribers;
+        # least recently written first
+        self.replay: "OrderedDict[str, ReplayBuffer]" = OrderedDict()
+        # called with (project token, log data, error name) for every delivered event
+        self.observers: List[Callable[[str, dict, Optional[str]], None]] = []
+        self.dropped_events = 0
+        self.disconnected_slow = 0
+        self.backend = backend or create_backend()
+
+    async def start(self):
+        await self.backend.start(self.deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def subscribe(self, project_token: str, log_filter: LogFilter = MATCH_ALL,
+                  subscriber: Optional[Subscriber] = None) -> Subscriber:
+        subscriber = subscriber or Subscriber(self.queue_size)
+        groups = self.connections.setdefault(project_token, {})
+        groups.setdefault(log_filter, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, project_token: str, log_filter: LogFilter, subscriber: Subscriber):
+        self.dropped_events += subscriber.dropped
+        subscriber.dropped = 0
+        groups = self.connections.get(project_token)
+        if groups is None:
+            return
+        subscribers = groups.get(log_filter)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.remove(subscriber)
+            if not subscribers:
+                del groups[log_filter]
+        if not groups:
+            del self.connections[project_token]
+
+    def _subscribers(self, project_token: Optional[str] = None):
+        tokens = [project_token] if project_token else list(self.connections)
+        for token in tokens:
+            for subscribers in self.connections.get(token, {}).values():
+                yield from subscribers
+
+    async def push(self, project_token: str, log_data: dict, error_name: Optional[str] = None):
+        await self.backend.publish(project_token, log_data, error_name)
 
-    def _get_or_create_queues(self, project_token: str) -> List[asyncio.Queue]:
-        if project_token not in self.connections:
-            self.connections[project_token] = []
-        return self.connections[project_token]
+    def add_observer(self, observer: Callable[[str, dict, Optional[str]], None]):
+        self.observers.append(observer)
 
-    async def push(self, project_token: str, log_data: dict):
-        queues = self._get_or_create_queues(project_token)
-        data_str = json.dumps(log_data, default=str)
-        for queue in queues:
-            await queue.put(data_str)
+    def deliver(self, project_token: str, log_data: dict, error_name: Optional[str] = None):
+        for observer in self.observers:
+            observer(project_token, log_data, error_name)
 
-    async def listen(self, project_token: str, request: Request) -> AsyncGenerator[str, None]:
-        queue: asyncio.Queue = asyncio.Queue()
-        self._get_or_create_queues(project_token).append(queue)
+        event_id = log_data.get("id")
+        if self.replay_size:
+            self._remember(project_token, (event_id, log_data, error_name))
+
+        groups = self.connections.get(project_token)
+        if not groups:
+            return
+        event = Event(event_id, log_data)
+        for log_filter, subscribers in list(groups.items()):
+            if not log_filter.matches(log_data, error_name):
+                continue
+            for subscriber in subscribers:
+                if subscriber.offer(event, self.overflow_policy):
+                    self.disconnected_slow += 1
+            alive = [s for s in subscribers if not s.closed]
+            if alive:
+                groups[log_filter] = alive
+            else:
+                del groups[log_filter]
+        if not groups:
+            del self.connections[project_token]
+
+    def _remember(self, project_token: str, entry: tuple):
+        now = time.monotonic()
+        buffer = self.replay.get(project_token)
+        if buffer is None:
+            buffer = self.replay[project_token] = ReplayBuffer(self.replay_size)
+        else:
+            self.replay.move_to_end(project_token)
+        buffer.append(entry)
+        buffer.touched = now
+
+        while len(self.replay) > self.replay_max_projects:
+            self.replay.popitem(last=False)
+        while self.replay:
+            oldest = next(iter(self.replay.values()))
+            if now - oldest.touched < self.replay_idle:
+                break
+            self.replay.popitem(last=False)
+
+    def _missed(self, project_token: str, log_filter: LogFilter, last_event_id: str) -> List[str]:
+        events = list(self.replay.get(project_token, ()))
+        ids = [str(event_id) for event_id, _, _ in events]
+        if last_event_id in ids:
+            events = events[ids.index(last_event_id) + 1:]
+        elif last_event_id.isdigit():
+            events = [e for e in events if isinstance(e[0], int) and e[0] > int(last_event_id)]
+        else:
+            events = []
+        return [
+            format_event(Event(event_id, log_data))
+            for event_id, log_data, error_name in events
+            if log_filter.matches(log_data, error_name)
+        ]
+
+    async def listen(self, project_token: str, request: Request, log_filter: LogFilter = MATCH_ALL,
+                     last_event_id: Optional[str] = None) -> AsyncGenerator[str, None]:
+        subscriber = self.subscribe(project_token, log_filter)
+        # taken right after subscribing, so nothing falls between replay and live events
+        missed = self._missed(project_token, log_filter, last_event_id) if last_event_id else []
+        loop = asyncio.get_running_loop()
 
         try:
-            while True:
-                if await request.is_disconnected():
+            if missed:
+                yield "".join(missed)
+            last_write = loop.time()
+
+            while not subscriber.closed:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    if loop.time() - last_write >= self.heartbeat_interval:
+                        yield HEARTBEAT
+                        last_write = loop.time()
+                    continue
+
+                if event is None:
                     break
 
-                data = await queue.get()
-                yield f"data: {data}\n\n"
+                # let a burst accumulate and send it as a single chunk
+                if self.coalesce_interval:
+                    await asyncio.sleep(self.coalesce_interval)
+                frames = [format_event(event)]
+                while not subscriber.queue.empty():
+                    event = subscriber.queue.get_nowait()
+                    if event is None:
+                        break
+                    frames.append(format_event(event))
+
+                yield "".join(frames)
+                last_write = loop.time()
         finally:
-            self.connections[project_token].remove(queue)
+            self.unsubscribe(project_token, log_filter, subscriber)
+
+    def stats(self) -> dict:
+        projects = {}
+        for token, groups in self.connections.items():
+            depths = [s.queue.qsize() for s in self._subscribers(token)]
+            projects[token] = {
+                "subscribers": len(depths),
+                "filters": len(groups),
+                "queue_depth": sum(depths),
+                "max_queue_depth": max(depths, default=0),
+            }
+        return {
+            "subscribers": sum(p["subscribers"] for p in projects.values()),
+            "queue_size": self.queue_size,
+            "overflow_policy": self.overflow_policy,
+            "dropped_events": self.dropped_events + sum(s.dropped for s in self._subscribers()),
+            "disconnected_slow": self.disconnected_slow,
+            "replay_buffers": len(self.replay),
+            "projects": projects,
+            "broadcast": self.backend.stats(),
+        }
 
 sse_manager = SSEManager()
@@ -0,0 +1,223 @@
+"""
+Synthetic log generator for development and benchmark datasets.
+
+Usage: python -m app.utils.synthetic --projects 20 --logs 1000000 --seed 42 --end 2025-01-01T00:00:00+00:00
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import insert
+
+from app.models import Project, project_users
+
+COLUMNS = ("message", "level", "timestamp", "token", "environment", "device", "error", "custom")
+
+DEVICES = {
+    "android": [("Google", "Pixel 7 Pro", 34), ("Samsung", "Galaxy S23", 33), ("OnePlus", "OnePlus 9", 33), ("Xiaomi", "Redmi Note 12", 31)],
+    "ios": [("Apple", "iPhone 14 Pro", 16), ("Apple", "iPhone 13", 15), ("Apple", "iPhone 15", 17)],
+    "web": [("Chrome", "Desktop", 120), ("Safari", "Desktop", 17), ("Firefox", "Desktop", 121)],
+}
+
+MESSAGES = {
+    "debug": ["Cache miss for key user_profile", "Rendering screen Home", "Fetched remote config"],
+    "info": ["User signed in", "Screen opened: Settings", "Sync completed", "Push notification received"],
+    "warning": ["Slow network response", "Permission denied", "Retrying request after timeout"],
+    "error": ["Server timeout", "Invalid login", "Failed to decode response", "Payment request failed"],
+    "critical": ["Crash on profile screen", "Data corruption detected during sync", "Out of memory"],
+}
+
+ERRORS = {
+    "warning": [("SecurityException", "E403"), ("TimeoutWarning", "W408")],
+    "error": [("TimeoutException", "504"), ("LoginException", "401"), ("FormatException", "E422")],
+    "critical": [("NullPointerException", "E500"), ("DataCorruption", "DC999"), ("OutOfMemoryError", "OOM")],
+}
+
+
+class SyntheticConfig(BaseModel):
+    projects: int = Field(3, ge=0, description="new projects to create")
+    tokens: List[str] = Field(default_factory=list, description="existing projects to fill as well")
+    logs: int = Field(10_000, ge=0, description="logs per project")
+    days: float = Field(7, gt=0)
+    end: Optional[datetime] = Field(None, description="newest timestamp; fix it with the seed for identical log contents")
+    seed: Optional[int] = None
+    chunk_size: int = Field(10_000, gt=0)
+
+    levels: Dict[str, float] = {"debug": 10, "info": 60, "warning": 18, "error": 10, "critical": 2}
+    environments: Dict[str, float] = {"production": 70, "staging": 20, "development": 10}
+    platforms: Dict[str, float] = {"android": 55, "ios": 40, "web": 5}
+    countries: Dict[str, float] = {"Ukraine": 30, "Germany": 20, "Poland": 15, "France": 12, "Spain": 8, "USA": 15}
+    app_versions: Dict[str, float] = {"3.1.0": 45, "3.0.2": 30, "3.0.0": 15, "2.9.1": 10}
+
+    # traffic follows a daily cycle peaking at `peak_hour` UTC; 0 is flat, 1 is silent at the trough
+    diurnal_amplitude: float = Field(0.6, ge=0, le=1)
+    peak_hour: float = Field(14, ge=0, lt=24)
+    # incidents: short windows that receive a share of all logs, mostly errors of one kind
+    incidents: int = Field(2, ge=0)
+    incident_minutes: float = Field(30, gt=0)
+    incident_share: float = Field(0.05, ge=0, le=1)
+
+
+class _Choice:
+    def __init__(self, weights: Dict):
+        self.values = list(weights)
+        self.cum_weights = list(accumulate(weights.values()))
+
+    def sample(self, rng: random.Random, k: int) -> list:
+        return rng.choices(self.values, cum_weights=self.cum_weights, k=k)
+
+
+class LogGenerator:
+    """Produces COPY-ready rows for one project in chunks, deterministically for a given seed."""
+
+    def __init__(self, config: SyntheticConfig, token: str, rng: random.Random, end: datetime):
+        self.config = config
+        self.token = token
+        self.rng = rng
+        self.start = end - timedelta(days=config.days)
+        self.span = (end - self.start).total_seconds()
+        midnight = self.start.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.lead = (self.start - midnight).total_seconds()
+        self.day_count = math.ceil((self.lead + self.span) / 86400)
+        self.levels = _Choice(config.levels)
+        self.environments = _Choice(config.environments)
+        self.platforms = _Choice(config.platforms)
+        self.countries = _Choice(config.countries)
+        self.versions = _Choice(config.app_versions)
+        self.hours = _Choice({
+            hour: 1 + config.diurnal_amplitude * math.cos(2 * math.pi * (hour - config.peak_hour) / 24)
+            for hour in range(24)
+        })
+        self.incidents = [
+            (rng.uniform(0, max(self.span - config.incident_minutes * 60, 0)), rng.choice(ERRORS["critical"] + ERRORS["error"]))
+            for _ in range(config.incidents)
+        ]
+
+    def _offset(self) -> float:
+        # a uniform day, an hour drawn from the diurnal curve and a uniform second within it,
+        # redrawn until it falls inside the window
+        while True:
+            hour = self.rng.randrange(self.day_count) * 24 + self.hours.sample(self.rng, 1)[0]
+            offset = hour * 3600 + self.rng.random() * 3600 - self.lead
+            if 0 <= offset < self.span:
+                return offset
+
+    def chunks(self):
+        remaining = self.config.logs
+        while remaining > 0:
+            size = min(self.config.chunk_size, remaining)
+            remaining -= size
+            yield self._chunk(size)
+
+    def _chunk(self, size: int) -> List[tuple]:
+        rng = self.rng
+        levels = self.levels.sample(rng, size)
+        environments = self.environments.sample(rng, size)
+        platforms = self.platforms.sample(rng, size)
+        countries = self.countries.sample(rng, size)
+        versions = self.versions.sample(rng, size)
+
+        rows = []
+        for i in range(size):
+            level, error = levels[i], None
+            if self.incidents and rng.random() < self.config.incident_share:
+                started, error = rng.choice(self.incidents)
+                offset = started + rng.random() * self.config.incident_minutes * 60
+                level = "critical" if error in ERRORS["critical"] else "error"
+            else:
+                offset = self._offset()
+                if level in ERRORS:
+                    error = rng.choice(ERRORS[level])
+
+            platform = platforms[i]
+            manufacturer, model, version = rng.choice(DEVICES[platform])
+            rows.append((
+                rng.choice(MESSAGES[level]),
+                level,
+                self.start + timedelta(seconds=offset),
+                self.token,
+                environments[i],
+                json.dumps({"platform": platform, "model": model, "version": version, "manufacturer": manufacturer}),
+                json.dumps({"name": error[0], "code": error[1]}) if error else None,
+                json.dumps({"appVersion": versions[i], "country": countries[i]}),
+            ))
+        return rows
+
+
+async def generate(config: SyntheticConfig, session_factory, engine, owner_id: Optional[int] = None) -> dict:
+    """Creates the configured projects, owned by `owner_id`, and streams their logs in with COPY, one chunk at a time."""
+    rng = random.Random(config.seed)
+    end = config.end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    # tokens are credentials and must not collide on a re-run, so only the logs follow the seed
+    new_tokens = [uuid.uuid4().hex for _ in range(config.projects)]
+    if new_tokens:
+        async with session_factory() as db:
+            await db.execute(insert(Project), [
+                {"id": token, "name": f"Synthetic {i + 1}"} for i, token in enumerate(new_tokens)
+            ])
+            if owner_id is not None:
+                await db.execute(insert(project_users), [
+                    {"project_id": token, "user_id": owner_id} for token in new_tokens
+                ])
+            await db.commit()
+
+    tokens = config.tokens + new_tokens
+    started = time.perf_counter()
+    rows = 0
+    async with engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        for token in tokens:
+            for chunk in LogGenerator(config, token, rng, end).chunks():
+                await driver.copy_records_to_table("logs", records=chunk, columns=COLUMNS)
+                rows += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "tokens": tokens,
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.utils.synthetic", description=__doc__)
+    for name, field in SyntheticConfig.model_fields.items():
+        if field.annotation in (int, float, Optional[int], Optional[datetime]):
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name, help=field.description)
+    parser.add_argument("--tokens", nargs="*", default=[])
+    parser.add_argument("--owner-id", type=int, help="user added to the new projects")
+    parser.add_argument("--config", help="JSON file with any SyntheticConfig fields, e.g. distributions")
+    args = parser.parse_args(argv)
+
+    values = {}
+    if args.config:
+        with open(args.config) as f:
+            values.update(json.load(f))
+    values.update({k: v for k, v in vars(args).items() if v not in (None, []) and k not in ("config", "owner_id")})
+    config = SyntheticConfig(**values)
+
+    from app.database import SessionLocal, engine
+
+    async def run():
+        try:
+            return await generate(config, SessionLocal, engine, args.owner_id)
+        finally:
+            await engine.dispose()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import sys
+
+from benchmarks.load.report import compare, load, print_result, save
+from benchmarks.load.runner import LoadConfig, LoadTest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="drive load against an in-process server")
+    run.add_argument("--duration", type=float, default=LoadConfig.duration)
+    run.add_argument("--warmup", type=float, default=LoadConfig.warmup)
+    run.add_argument("--ingest-rps", type=float, default=LoadConfig.ingest_rps)
+    run.add_argument("--ingest-workers", type=int, default=LoadConfig.ingest_workers)
+    run.add_argument("--sse", type=int, default=LoadConfig.sse_subscribers, help="concurrent SSE subscribers")
+    run.add_argument("--list-pollers", type=int, default=LoadConfig.list_pollers)
+    run.add_argument("--dashboard-pollers", type=int, default=LoadConfig.dashboard_pollers)
+    run.add_argument("--poll-interval", type=float, default=LoadConfig.poll_interval)
+    run.add_argument("--save", metavar="PATH", help="write the result as JSON, e.g. a baseline")
+
+    diff = commands.add_parser("compare", help="fail if a run regressed against a baseline")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = compare(load(args.baseline), load(args.current), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("No regressions")
+        return 1 if regressions else 0
+
+    config = LoadConfig(
+        duration=args.duration,
+        warmup=args.warmup,
+        ingest_rps=args.ingest_rps,
+        ingest_workers=args.ingest_workers,
+        sse_subscribers=args.sse,
+        list_pollers=args.list_pollers,
+        dashboard_pollers=args.dashboard_pollers,
+        poll_interval=args.poll_interval,
+    )
+    result = asyncio.run(LoadTest(config).run())
+    print_result(result)
+    if args.save:
+        save(result, args.save)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
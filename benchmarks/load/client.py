@@ -0,0 +1,97 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class HTTPConnection:
+    """
+    Minimal keep-alive HTTP/1.1 client over asyncio streams.
+
+    Enough for JSON requests and SSE responses against uvicorn, without
+    adding a client library to the project's dependencies.
+    """
+
+    def __init__(self, host: str, port: int, token: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self):
+        if self.writer is None or self.writer.is_closing():
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+    def _send(self, method: str, path: str, body: bytes = b"", params: Optional[dict] = None):
+        if params:
+            path = f"{path}?{urlencode({k: v for k, v in params.items() if v is not None})}"
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        if body:
+            headers.append("Content-Type: application/json")
+        if self.token:
+            headers.append(f"Authorization: Bearer {self.token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+
+    async def _read_head(self) -> Tuple[int, dict]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                return status, headers
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _read_chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            size = int((await self.reader.readline()).strip(), 16)
+            if size == 0:
+                await self.reader.readline()
+                return
+            chunk = await self.reader.readexactly(size)
+            await self.reader.readline()
+            yield chunk
+
+    async def request(self, method: str, path: str, payload=None, params: Optional[dict] = None):
+        """Returns the status code and decoded JSON body."""
+        await self._connect()
+        self._send(method, path, json.dumps(payload).encode() if payload is not None else b"", params)
+        await self.writer.drain()
+        status, headers = await self._read_head()
+        if headers.get("transfer-encoding") == "chunked":
+            body = b"".join([chunk async for chunk in self._read_chunks()])
+        else:
+            body = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, json.loads(body) if body else None
+
+    async def events(self, path: str, params: Optional[dict] = None) -> AsyncIterator[str]:
+        """Yields the data of each server-sent event until the connection ends."""
+        await self._connect()
+        self._send("GET", path, params=params)
+        await self.writer.drain()
+        status, _ = await self._read_head()
+        if status != 200:
+            raise ConnectionError(f"Stream {path} returned {status}")
+        buffer = b""
+        async for chunk in self._read_chunks():
+            buffer += chunk
+            while b"\n\n" in buffer:
+                raw, buffer = buffer.split(b"\n\n", 1)
+                data = [line[6:] for line in raw.decode().splitlines() if line.startswith("data: ")]
+                if data:
+                    yield "\n".join(data)
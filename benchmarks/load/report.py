@@ -0,0 +1,81 @@
+import json
+from typing import Dict, List
+
+# metrics where a higher value is a regression; throughput is the opposite
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, endpoint: str, seconds: float, ok: bool = True):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration: float, db_queries: Dict[str, int]) -> Dict[str, dict]:
+        endpoints = {}
+        for endpoint, samples in self.latencies.items():
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_rps": round(len(samples) / duration, 2),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+                "max_ms": round(max(samples) * 1000, 2),
+            }
+            if endpoint in db_queries:
+                endpoints[endpoint]["db_queries_per_request"] = round(db_queries[endpoint] / len(samples), 2)
+        return endpoints
+
+
+def save(result: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Lists every endpoint metric that got worse than `tolerance` allows."""
+    regressions = []
+    for endpoint, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(endpoint)
+        if after is None:
+            regressions.append(f"{endpoint}: missing from the current run")
+            continue
+        for key in LATENCY_KEYS:
+            if after[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{endpoint}: {key} {before[key]} -> {after[key]}")
+        if after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: throughput_rps {before['throughput_rps']} -> {after['throughput_rps']}")
+        if after.get("db_queries_per_request", 0) > before.get("db_queries_per_request", 0):
+            regressions.append(
+                f"{endpoint}: db_queries_per_request {before.get('db_queries_per_request')} -> {after['db_queries_per_request']}"
+            )
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{endpoint}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+def print_result(result: dict):
+    print(f"{'endpoint':36} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for endpoint, stats in sorted(result["endpoints"].items()):
+        print(
+            f"{endpoint:36} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+            f"{stats.get('db_queries_per_request', '-'):>8}"
+        )
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import random
+import socket
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.load.client import HTTPConnection
+from benchmarks.load.report import Recorder
+
+HOST = "127.0.0.1"
+LEVELS = ("info", "info", "info", "warning", "error", "debug")
+ENVIRONMENTS = ("production", "staging", "development")
+PLATFORMS = ("android", "ios", "web")
+
+
+@dataclass
+class LoadConfig:
+    duration: float = 30
+    warmup: float = 3
+    ingest_rps: float = 100
+    ingest_workers: int = 16
+    sse_subscribers: int = 10
+    list_pollers: int = 2
+    dashboard_pollers: int = 2
+    poll_interval: float = 0.5
+
+
+# endpoint label -> route template used by the DB statement metrics
+ENDPOINTS = {
+    "POST /logs": "/logs",
+    "GET /logs/{project_token}": "/logs/{project_token}",
+    "GET /projects/{project_token}/dashboard": "/projects/{project_token}/dashboard",
+    "SSE delivery": None,
+}
+
+
+def db_query_counts() -> Dict[str, int]:
+    from app.utils.metrics import DB_QUERY_LATENCY
+
+    counts: Dict[str, int] = {}
+    for (route, _operation), (_buckets, total, _sum) in list(DB_QUERY_LATENCY.series.items()):
+        counts[route] = counts.get(route, 0) + total
+    return counts
+
+
+def log_payload(token: str) -> dict:
+    return {
+        # the send time lets SSE subscribers measure delivery latency
+        "message": f"load-test {time.monotonic()}",
+        "level": random.choice(LEVELS),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "token": token,
+        "environment": random.choice(ENVIRONMENTS),
+        "device": {"platform": random.choice(PLATFORMS), "model": "bench", "version": 34},
+    }
+
+
+class LoadTest:
+    def __init__(self, config: LoadConfig):
+        self.config = config
+        self.recorder = Recorder()
+        self.recording = False
+        self.stopping = asyncio.Event()
+        self.port = 0
+        self.access_token = ""
+        self.project = ""
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        if self.recording:
+            self.recorder.add(endpoint, seconds, ok)
+
+    async def start_server(self):
+        import uvicorn
+        from app.main import app
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((HOST, 0))
+        self.port = sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self.server_task = asyncio.create_task(self.server.serve(sockets=[sock]))
+        while not self.server.started:
+            if self.server_task.done():
+                self.server_task.result()
+                raise RuntimeError("Server exited during startup")
+            await asyncio.sleep(0.05)
+
+    async def setup(self):
+        conn = HTTPConnection(HOST, self.port)
+        status, tokens = await conn.request(
+            "POST", "/auth/login", {"email": f"load-{uuid.uuid4().hex[:12]}@example.com", "password": uuid.uuid4().hex}
+        )
+        if status != 200:
+            raise RuntimeError(f"Login failed with {status}: {tokens}")
+        self.access_token = tokens["access_token"]
+        conn.token = self.access_token
+        status, project = await conn.request("POST", "/projects/", {"name": "load-test"})
+        if status != 200:
+            raise RuntimeError(f"Project creation failed with {status}: {project}")
+        self.project = project["id"]
+        await conn.close()
+
+    async def teardown(self):
+        conn = HTTPConnection(HOST, self.port, self.access_token)
+        await conn.request("DELETE", f"/projects/{self.project}")
+        await conn.close()
+        self.server.should_exit = True
+        await self.server_task
+
+    async def ingest(self):
+        if self.config.ingest_rps <= 0:
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        workers = [asyncio.create_task(self._ingest_worker(queue)) for _ in range(self.config.ingest_workers)]
+        interval = 1 / self.config.ingest_rps
+        next_at = time.monotonic()
+        while not self.stopping.is_set():
+            # latency is measured from the scheduled send time, so a slow
+            # server cannot hide queueing by slowing the load down
+            queue.put_nowait(next_at)
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+        for _ in workers:
+            queue.put_nowait(None)
+        await asyncio.gather(*workers)
+
+    async def _ingest_worker(self, queue: asyncio.Queue):
+        conn = HTTPConnection(HOST, self.port)
+        while (scheduled := await queue.get()) is not None:
+            try:
+                status, _ = await conn.request("POST", "/logs", log_payload(self.project))
+                ok = status == 200
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await conn.close()
+                ok = False
+            self.record("POST /logs", time.monotonic() - scheduled, ok)
+        await conn.close()
+
+    async def poll(self, endpoint: str, path: str, params: dict = None):
+        conn = HTTPConnection(HOST, self.port, self.access_token)
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            try:
+                status, _ = await conn.request("GET", path, params=params)
+                ok = status == 200
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await conn.close()
+                ok = False
+            self.record(endpoint, time.monotonic() - started, ok)
+            await asyncio.sleep(self.config.poll_interval)
+        await conn.close()
+
+    async def subscribe(self):
+        conn = HTTPConnection(HOST, self.port, self.access_token)
+        try:
+            async for data in conn.events(f"/logs/stream/{self.project}"):
+                sent = float(json.loads(data)["message"].split()[1])
+                self.record("SSE delivery", time.monotonic() - sent)
+        finally:
+            await conn.close()
+
+    async def run(self) -> dict:
+        await self.start_server()
+        try:
+            await self.setup()
+            subscribers = [asyncio.create_task(self.subscribe()) for _ in range(self.config.sse_subscribers)]
+            load: List[asyncio.Task] = [asyncio.create_task(self.ingest())]
+            load += [
+                asyncio.create_task(self.poll("GET /logs/{project_token}", f"/logs/{self.project}", {"limit": 50}))
+                for _ in range(self.config.list_pollers)
+            ]
+            load += [
+                asyncio.create_task(
+                    self.poll("GET /projects/{project_token}/dashboard", f"/projects/{self.project}/dashboard")
+                )
+                for _ in range(self.config.dashboard_pollers)
+            ]
+
+            await asyncio.sleep(self.config.warmup)
+            queries_before = db_query_counts()
+            self.recording = True
+            started = time.monotonic()
+            await asyncio.sleep(self.config.duration)
+            self.recording = False
+            elapsed = time.monotonic() - started
+            queries_after = db_query_counts()
+
+            self.stopping.set()
+            await asyncio.gather(*load)
+            for task in subscribers:
+                task.cancel()
+            await asyncio.gather(*subscribers, return_exceptions=True)
+        finally:
+            if self.project:
+                await self.teardown()
+            else:
+                self.server.should_exit = True
+                await self.server_task
+
+        db_queries = {
+            endpoint: queries_after.get(route, 0) - queries_before.get(route, 0)
+            for endpoint, route in ENDPOINTS.items()
+            if route is not None
+        }
+        return {
+            "config": asdict(self.config),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "duration_s": round(elapsed, 2),
+            "endpoints": self.recorder.summary(elapsed, db_queries),
+        }
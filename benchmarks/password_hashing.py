@@ -0,0 +1,61 @@
+"""
+Event-loop latency while logins hash passwords.
+
+Runs CONCURRENCY bcrypt verifications inline (the old behaviour) and
+through `password_hasher`, while a ticker measures how late the event loop
+wakes up. Usage: python -m benchmarks.password_hashing [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from app.auth.passwords import password_hasher, pwd_context
+
+TICK_SECONDS = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, samples: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(loop.time() - started - TICK_SECONDS)
+
+
+async def run(label: str, login, concurrency: int):
+    stop = asyncio.Event()
+    samples: list = []
+    ticker = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{label:8} logins={concurrency} total={elapsed * 1000:.0f}ms "
+        f"loop_lag_p50={statistics.median(samples) * 1000:.1f}ms "
+        f"p99={p99 * 1000:.1f}ms max={samples[-1] * 1000:.1f}ms"
+    )
+
+
+async def main(concurrency: int):
+    hashed = pwd_context.hash("correct horse battery staple")
+
+    async def inline_login():
+        pwd_context.verify("correct horse battery staple", hashed)
+
+    async def pooled_login():
+        await password_hasher.verify("correct horse battery staple", hashed)
+
+    await run("inline", inline_login, concurrency)
+    await run("pooled", pooled_login, concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 16))
@@ -0,0 +1,25 @@
+from app.utils import payloads
+from app.utils.payloads import PAYLOAD_MAX_KEY, TRUNCATED, encoded_size, limit_payload
+
+
+def test_long_keys_sharing_a_prefix_stay_distinct():
+    prefix = "k" * (PAYLOAD_MAX_KEY + 10)
+    value = {f"{prefix}{i}": i for i in range(1000)}
+
+    result = limit_payload("custom", value)
+
+    kept = [key for key in result if key != TRUNCATED]
+    omitted = result.get(TRUNCATED, {}).get("omitted", 0)
+    assert len(set(kept)) == len(kept)
+    assert len(kept) + omitted == 1000
+    assert all(len(key) < PAYLOAD_MAX_KEY + 20 for key in kept)
+
+
+def test_result_fits_the_field_limit():
+    value = {f"key{i}" * 3: "v" * 40 for i in range(20_000)}
+
+    result = limit_payload("device", value)
+
+    assert encoded_size(result) <= payloads.PAYLOAD_MAX_BYTES["device"]
+    assert result[TRUNCATED]["omitted"] == len(value) - (len(result) - 1)
+    assert len(result[TRUNCATED]["sample"]) == payloads.OMITTED_SAMPLE